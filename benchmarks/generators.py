@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成测试数据
+
+所有生成器都由 seed 决定，同一参数每次生成完全相同的数据，结果可以横向比较。
+- synthetic_vocabulary: 指定条数的词汇（英文由音节拼成，中文从常用字中抽取）
+- synthetic_text: 指定字节数的英文文档
+- synthetic_docx: 指定正文大小的 Word 文档，含多层嵌套表格、页眉和脚注
+"""
+
+import io
+import random
+import zipfile
+from xml.sax.saxutils import escape
+
+SYLLABLES = (
+    "ota", "flash", "boot", "load", "sig", "ver", "cert", "diag", "ecu", "can",
+    "gate", "way", "sync", "part", "ion", "delta", "hash", "key", "vin", "log",
+    "trace", "bus", "node", "stack", "pack", "age", "roll", "back", "patch", "zone",
+)
+HANZI = "固件升级诊断刷写校验签名证书网关分区回滚差分包控制单元车辆通信协议日志测试版本安装下载验证失败成功重启电源模块"
+CATEGORIES = tuple(f"分类{i:02d}" for i in range(24))
+FILLER_WORDS = ("the", "and", "with", "for", "after", "before", "during", "when", "this", "that", "is", "was")
+
+
+def _term(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def synthetic_vocabulary(n, seed=0):
+    """n 条词汇字典（字段与词库一致），英文不保证唯一，与真实导入的数据相似"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        english = _term(rng)
+        items.append({
+            "id": f"v{i:07d}",
+            "english": english,
+            "chinese": "".join(rng.choice(HANZI) for _ in range(rng.randint(2, 5))),
+            "phonetic": "",
+            "example": f"Check the {english} before release.",
+            "category": rng.choice(CATEGORIES),
+        })
+    return items
+
+
+def _sentence_pool(rng, size=2000, vocab_size=5000):
+    terms = [_term(rng) for _ in range(vocab_size)]
+    pool = []
+    for _ in range(size):
+        words = [rng.choice(terms) if rng.random() < 0.6 else rng.choice(FILLER_WORDS)
+                 for _ in range(rng.randint(6, 16))]
+        words[0] = words[0].capitalize()
+        pool.append(" ".join(words) + rng.choice(".!?"))
+    return pool
+
+
+def _sentences(size, seed):
+    """产出总长度约为 size 字节的句子（从固定的句子池中有放回抽取，大文档也能很快生成）"""
+    rng = random.Random(seed)
+    pool = _sentence_pool(rng)
+    total = 0
+    while total < size:
+        batch = rng.choices(pool, k=1024)
+        for sentence in batch:
+            yield sentence
+            total += len(sentence) + 1
+            if total >= size:
+                return
+
+
+def synthetic_text(size, seed=0):
+    """约 size 字节的英文文本（UTF-8 字节串）"""
+    lines = []
+    for i, sentence in enumerate(_sentences(size, seed)):
+        lines.append(sentence)
+        lines.append("\n" if i % 8 == 7 else " ")
+    return "".join(lines).encode("utf-8")
+
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/header1.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml"/>
+<Override PartName="/word/footnotes.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"/>
+</Types>"""
+_PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+_W_OPEN = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:{0} xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+
+
+def _paragraph(text):
+    return f'<w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def _table(sentences, depth):
+    """2x2 表格，每个单元格一段文字，depth > 1 时第一个单元格里再嵌套一层表格"""
+    cells = []
+    for i in range(4):
+        inner = _paragraph(next(sentences, ""))
+        if i == 0 and depth > 1:
+            inner += _table(sentences, depth - 1)
+        cells.append(f"<w:tc>{inner}</w:tc>")
+    return f"<w:tbl><w:tr>{cells[0]}{cells[1]}</w:tr><w:tr>{cells[2]}{cells[3]}</w:tr></w:tbl>"
+
+
+def synthetic_docx(size, seed=0, nesting=3):
+    """正文约 size 字节的 DOCX（字节串）：段落与 nesting 层嵌套表格交替出现"""
+    sentences = _sentences(size, seed)
+    body = io.StringIO()
+    body.write(_W_OPEN.format("document") + "<w:body>")
+    for i, sentence in enumerate(sentences):
+        body.write(_paragraph(sentence))
+        if i % 10 == 9:
+            body.write(_table(sentences, nesting))
+    body.write("</w:body></w:document>")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _PACKAGE_RELS)
+        zf.writestr("word/document.xml", body.getvalue())
+        zf.writestr("word/header1.xml", _W_OPEN.format("hdr") + _paragraph("OTA Test Specification") + "</w:hdr>")
+        zf.writestr(
+            "word/footnotes.xml",
+            _W_OPEN.format("footnotes") + '<w:footnote w:id="1">'
+            + _paragraph("Signed packages are verified by the gateway before flashing.")
+            + "</w:footnote></w:footnotes>",
+        )
+    return buffer.getvalue()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试
+
+覆盖文档提取（单词、句子、Word）、提取单词的相关度排序、词汇搜索、测验出题、学习进度写入和自定义词库写入。
+每项测试记录耗时（多次运行取最小值和中位数）和峰值内存（tracemalloc，单独运行一次），
+结果写入 JSON 文件，并与保存的基线比较，超出容差的项目标记为退化。
+
+用法（在项目根目录执行）:
+    python -m benchmarks.run                       # small 规模，与 benchmarks/baseline.json 比较
+    python -m benchmarks.run --scale large         # 最大到 100 万词条 / 100 MB 文档
+    python -m benchmarks.run -k extract            # 只运行名称包含 extract 的项目
+    python -m benchmarks.run --save-baseline       # 把本次结果保存为新的基线
+
+基线与机器相关，更换机器或 Python 版本后应先在旧代码上重新生成基线。
+"""
+
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.generators import synthetic_docx, synthetic_text, synthetic_vocabulary  # noqa: E402
+from corpus import VocabRecord  # noqa: E402
+from corpus_index import CategoryIndex, DistractorSampler, VocabularySearchIndex  # noqa: E402
+from extractor import extract_docx_content, extract_sentences_from_text, extract_words_from_text  # noqa: E402
+from progress_store import ProgressStore  # noqa: E402
+from ranking import rank_terms  # noqa: E402
+from storage import CustomStore  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+DEFAULT_OUTPUT = BENCH_DIR / "results.json"
+
+KB = 1024
+MB = 1024 * KB
+
+# 各规模下的数据量：terms 为词条数，text 为文本文档字节数，docx 为 Word 正文字节数
+SCALES = {
+    "small": {"terms": [1_000, 10_000], "text": [1 * KB, 1 * MB], "docx": [100 * KB]},
+    "medium": {"terms": [1_000, 100_000], "text": [1 * KB, 10 * MB], "docx": [1 * MB, 10 * MB]},
+    "large": {"terms": [1_000, 100_000, 1_000_000], "text": [1 * KB, 10 * MB, 100 * MB], "docx": [10 * MB, 100 * MB]},
+}
+
+# 低于该绝对差值的变化视为噪声，不算退化
+MIN_SECONDS_DELTA = 0.005
+MIN_PEAK_DELTA = 1 * MB
+
+
+def _size_label(size):
+    if size >= MB:
+        return f"{size // MB}MB"
+    if size >= KB:
+        return f"{size // KB}KB"
+    return str(size)
+
+
+def _count_label(n):
+    if n >= 1_000_000:
+        return f"{n // 1_000_000}M"
+    if n >= 1_000:
+        return f"{n // 1_000}k"
+    return str(n)
+
+
+# ==================== 测试项目 ====================
+# 每个项目接收数据量，完成准备工作后返回被测函数（无参数，可重复调用）
+
+def bench_extract_words(size):
+    text = synthetic_text(size).decode("utf-8")
+    return lambda: extract_words_from_text(text)
+
+
+def bench_extract_sentences(size):
+    text = synthetic_text(size).decode("utf-8")
+    return lambda: extract_sentences_from_text(text)
+
+
+def bench_extract_docx(size):
+    data = synthetic_docx(size)
+    return lambda: extract_docx_content(data)
+
+
+def bench_rank_terms(n):
+    """n 个候选单词（与提取结果格式相同）按相关度取前 200 个"""
+    rng = random.Random(4)
+    words = [item["english"] + str(i) for i, item in enumerate(synthetic_vocabulary(n))]
+    lines = [rng.randint(1, 50) for _ in range(n)]
+    result = {
+        "words": words,
+        "counts": [k + rng.randint(0, 50) for k in lines],
+        "lines": lines,
+        "cooc": [rng.randint(0, k) for k in lines],
+        "tokens": n * 100,
+    }
+    return lambda: rank_terms([result], 200)
+
+
+def _records(n):
+    return [VocabRecord.from_dict(item) for item in synthetic_vocabulary(n)]
+
+
+def bench_search_build(n):
+    words = _records(n)
+    return lambda: VocabularySearchIndex(words)
+
+
+def bench_search_query(n):
+    words = _records(n)
+    index = VocabularySearchIndex(words)
+    rng = random.Random(1)
+    queries = []
+    for word in rng.sample(words, min(200, len(words))):
+        english = word["english"]
+        queries += [english[:1], english[:3], english[1:7], word["chinese"][:2]]
+    return lambda: [index.search(q) for q in queries]
+
+
+def bench_quiz_generate(n):
+    """与 show_quiz 相同的出题流程：抽题 + 每题 3 个干扰项，普通和困难模式各 50 套 x 10 题"""
+    words = _records(n)
+    categories = CategoryIndex(words, "category")
+
+    def run():
+        rng = random.Random(2)
+        sampler = DistractorSampler(words, categories)
+        for hard in (False, True):
+            for _ in range(50):
+                for word in rng.sample(words, 10):
+                    sampler.sample(word, 3, hard=hard, rng=rng)
+    return run
+
+
+def bench_progress_record(n):
+    """n 条学习记录按每批 100 条追加到日志（与后台写入线程相同），再压缩进快照并重新读取"""
+    rng = random.Random(3)
+    records = [(f"v{rng.randrange(n):07d}", rng.choice((10, 15, -5, -10)), 1_700_000_000 + i, "quiz", 4, "分类00")
+               for i in range(n)]
+
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ProgressStore(Path(tmp) / "progress.json", compact_bytes=1 << 62)
+            for i in range(0, len(records), 100):
+                store.record_many(records[i:i + 100])
+            store.compact()
+            store.load()
+    return run
+
+
+def bench_custom_add(n):
+    """n 条自定义词汇一次性写入 SQLite 词库（分配 id + 去重索引）"""
+    items = synthetic_vocabulary(n)
+    for item in items:
+        del item["id"]
+
+    def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = CustomStore(Path(tmp) / "custom.db")
+            try:
+                store.add_vocabulary([dict(item) for item in items], skip_existing=True)
+            finally:
+                store.close()
+    return run
+
+
+# (名称, 测试函数, 数据量维度, 标签格式)
+BENCHMARKS = [
+    ("extract.words", bench_extract_words, "text", _size_label),
+    ("extract.sentences", bench_extract_sentences, "text", _size_label),
+    ("extract.docx", bench_extract_docx, "docx", _size_label),
+    ("rank.terms", bench_rank_terms, "terms", _count_label),
+    ("search.build", bench_search_build, "terms", _count_label),
+    ("search.query", bench_search_query, "terms", _count_label),
+    ("quiz.generate", bench_quiz_generate, "terms", _count_label),
+    ("progress.record", bench_progress_record, "terms", _count_label),
+    ("custom.add", bench_custom_add, "terms", _count_label),
+]
+
+
+# ==================== 运行与比较 ====================
+def measure(fn, repeat):
+    """返回 (最短耗时, 中位耗时, 峰值内存字节)"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+
+def run_benchmarks(scale, pattern=None, repeat=3, log=print):
+    results = {}
+    for name, factory, dimension, label in BENCHMARKS:
+        for size in SCALES[scale][dimension]:
+            case = f"{name}[{label(size)}]"
+            if pattern and pattern not in case:
+                continue
+            fn = factory(size)
+            best, median, peak = measure(fn, repeat)
+            del fn
+            results[case] = {"seconds": round(best, 6), "median": round(median, 6), "peak_bytes": peak}
+            log(f"{case:<32} {best * 1000:>10.1f} ms {peak / MB:>10.1f} MB")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """与基线比较，返回 [(项目, 指标, 基线值, 本次值)]，只列出超出容差的退化项"""
+    regressions = []
+    for case, current in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        for metric, min_delta in (("seconds", MIN_SECONDS_DELTA), ("peak_bytes", MIN_PEAK_DELTA)):
+            old, new = base.get(metric), current[metric]
+            if old is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append((case, metric, old, new))
+    return regressions
+
+
+def _load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_results(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OTA 英语学习工具性能基准测试")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="数据规模（默认 small）")
+    parser.add_argument("-k", dest="pattern", help="只运行名称包含该字符串的项目")
+    parser.add_argument("--repeat", type=int, default=3, help="计时重复次数（默认 3）")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="结果文件")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="基线文件")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对退化幅度（默认 0.25）")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scale, args.pattern, max(1, args.repeat))
+    data = {
+        "meta": {
+            "scale": args.scale,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    _write_results(args.output, data)
+    print(f"\n结果已写入 {args.output}")
+
+    if args.save_baseline:
+        baseline = _load_results(args.baseline)["results"] if args.baseline.exists() else {}
+        baseline.update(results)
+        data["results"] = baseline
+        _write_results(args.baseline, data)
+        print(f"基线已更新: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("没有基线文件，跳过比较（使用 --save-baseline 生成）")
+        return 0
+    regressions = compare(results, _load_results(args.baseline)["results"], args.tolerance)
+    if not regressions:
+        print(f"与基线相比没有超过 {args.tolerance:.0%} 的退化")
+        return 0
+    print(f"\n以下项目比基线慢或占用更多内存（容差 {args.tolerance:.0%}）:")
+    for case, metric, old, new in regressions:
+        if metric == "seconds":
+            print(f"  {case:<32} 耗时 {old * 1000:.1f} ms -> {new * 1000:.1f} ms")
+        else:
+            print(f"  {case:<32} 峰值内存 {old / MB:.1f} MB -> {new / MB:.1f} MB")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行批量导入 - 不经过浏览器，把大量 TXT/MD/DOCX 文档导入自定义词库
+
+- 支持多个通配符（** 递归匹配），按参数顺序处理，同一文件只处理一次
+- 文件在进程池中从磁盘流式读取和提取，同时在途的文件数有上限，内存占用与文件大小和总数无关
+- 提取结果与网页导入共用磁盘缓存，内容没变的文件不再解析
+- 与内置词库和已有自定义词库去重（单词按规范键；句子不区分大小写），自定义词库中已有单词的
+  新变形记为该条目的别名（内置词库只读，不记录），所有改动在一个事务内写入
+- 指定 --top N 时只导入按领域相关度排序（见 ranking.py）最靠前的 N 个新单词
+- 网页端通过词库的 revision 自动发现新数据，无需重启
+- --dry-run 不改动数据目录：不写提取缓存，词库（含旧版 JSON 迁移）在临时副本上统计
+
+用法:
+    python bulk_import.py "specs/**/*.docx" "notes/*.md"
+    python bulk_import.py "dump/**/*" --category 需求文档 --scenario 需求评审 --dry-run
+    python bulk_import.py "specs/*.docx" --top 200 --no-sentences
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from pathlib import Path
+
+from corpus import builtin_corpus
+from extractor import SENTENCE_LIMIT, ExtractionCache, extract_path, file_content_key, merge_extractions
+from lemma import ALIAS_SEPARATOR, canonical_key
+from ranking import rank_terms
+from storage import CustomStore, term_key
+
+# 与 app.py 中的数据目录和文件名一致
+DEFAULT_DATA_DIR = Path(os.path.expanduser("~")) / ".ota_english"
+CUSTOM_DB_NAME = "custom_vocabulary.db"
+LEGACY_JSON_NAME = "custom_vocabulary.json"
+EXTRACT_CACHE_NAME = "extract_cache"
+
+SUPPORTED_SUFFIXES = {".txt", ".md", ".docx"}
+PENDING_TRANSLATION = "(待翻译)"
+
+
+def expand_paths(patterns):
+    """展开通配符，返回支持的文件路径（按参数顺序，每个通配符内按路径排序，去重）"""
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        matches = glob.glob(os.path.expanduser(pattern), recursive=True)
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        for match in sorted(matches):
+            path = Path(match)
+            if not path.is_file() or path.suffix.lower() not in SUPPORTED_SUFFIXES:
+                continue
+            key = path.resolve()
+            if key not in seen:
+                seen.add(key)
+                paths.append(path)
+    return paths
+
+
+def extract_paths(paths, cache, workers, log):
+    """逐个提取文件，返回与 paths 顺序一致的结果列表（失败的带 "error"）"""
+    results = [None] * len(paths)
+    stats = {"cached": 0, "extracted": 0, "failed": 0}
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            i, key = pending.pop(future)
+            try:
+                results[i] = cache.put(key, future.result())
+                stats["extracted"] += 1
+            except Exception as e:
+                results[i] = {"name": str(paths[i]), "error": str(e)}
+                stats["failed"] += 1
+            _log_result(log, i, len(paths), paths[i], results[i])
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, path in enumerate(paths):
+            try:
+                key = file_content_key(path)
+            except OSError as e:
+                results[i] = {"name": str(path), "error": str(e)}
+                stats["failed"] += 1
+                _log_result(log, i, len(paths), path, results[i])
+                continue
+            cached = cache.get(key)
+            if cached is not None:
+                results[i] = cached
+                stats["cached"] += 1
+                _log_result(log, i, len(paths), path, cached, cached=True)
+                continue
+            # 在途文件数达到上限时先等一个完成，避免积压的任务和结果占用内存
+            while len(pending) >= workers * 2:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending[pool.submit(extract_path, str(path))] = (i, key)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    return results, stats
+
+
+def _log_result(log, i, total, path, result, cached=False):
+    if "error" in result:
+        log(f"[{i + 1}/{total}] ✗ {path}: {result['error']}")
+    else:
+        note = "（缓存）" if cached else ""
+        log(f"[{i + 1}/{total}] {path}: {len(result['words'])} 个单词, {len(result['sentences'])} 个句子{note}")
+
+
+def new_items(texts, known, build, key=str.lower):
+    """词条键（key）不在 known 中的条目，按键去重；与网页导入的规则一致"""
+    seen = set()
+    items = []
+    for text in texts:
+        term = key(text)
+        if term in known or term in seen:
+            continue
+        seen.add(term)
+        items.append(build(text))
+    return items
+
+
+def existing_aliases(words, aliases, existing, builtin):
+    """自定义词库中已有的单词（existing 为 {规范键: id}）的写法和变形：{条目 id: [写法]}
+
+    与内置词库同键的不记录（内置词库只读，自定义词库中的同键条目是重复的）。
+    """
+    forms_by_id = {}
+    for word in words:
+        key = canonical_key(word)
+        if key in existing and key not in builtin:
+            forms_by_id.setdefault(existing[key], []).extend([word, *aliases.get(word, ())])
+    return forms_by_id
+
+
+@contextmanager
+def open_store(data_dir, dry_run=False):
+    """打开自定义词库；试运行时打开临时目录中的副本，建库、旧版 JSON 迁移等都只发生在副本上"""
+    if not dry_run:
+        store = CustomStore(data_dir / CUSTOM_DB_NAME, legacy_json=data_dir / LEGACY_JSON_NAME)
+        try:
+            yield store
+        finally:
+            store.close()
+        return
+    with tempfile.TemporaryDirectory(prefix="ota_dry_run_") as tmp:
+        scratch = Path(tmp)
+        # 只读复制：数据库、未检查点的 WAL（打开副本时由 SQLite 恢复）和待迁移的旧版 JSON
+        for name in (CUSTOM_DB_NAME, CUSTOM_DB_NAME + "-wal", LEGACY_JSON_NAME):
+            if (data_dir / name).exists():
+                shutil.copyfile(data_dir / name, scratch / name)
+        store = CustomStore(scratch / CUSTOM_DB_NAME, legacy_json=scratch / LEGACY_JSON_NAME)
+        try:
+            yield store
+        finally:
+            store.close()
+
+
+def run_import(patterns, data_dir=DEFAULT_DATA_DIR, category="导入文档", scenario="文档内容",
+               words=True, sentences=True, top_words=None, dry_run=False, workers=None, log=print):
+    """执行一次导入，返回汇总字典"""
+    started = time.perf_counter()
+    data_dir = Path(data_dir)
+    if not dry_run:
+        data_dir.mkdir(parents=True, exist_ok=True)
+    paths = expand_paths(patterns)
+    summary = {"files": len(paths), "dry_run": dry_run}
+    if not paths:
+        summary["error"] = "没有匹配的 TXT/MD/DOCX 文件"
+        return summary
+
+    # 试运行只用内存缓存，不在数据目录中写入提取结果
+    cache = ExtractionCache(spill_dir=None if dry_run else data_dir / EXTRACT_CACHE_NAME)
+    results, stats = extract_paths(paths, cache, max(1, workers or os.cpu_count() or 1), log)
+    succeeded = [r for r in results if "error" not in r]
+    found_words, found_sentences, aliases = merge_extractions(succeeded)
+    if not words:
+        found_words = []
+    if not sentences:
+        found_sentences = []
+
+    with open_store(data_dir, dry_run) as store:
+        if store.migration_warning:
+            log(f"⚠️ {store.migration_warning}")
+        corpus = builtin_corpus()
+        builtin_words = {term_key("vocabulary", w["english"]) for w in corpus.vocabulary}
+        existing_words = store.lookup_terms("vocabulary", found_words)
+        known_words = builtin_words | existing_words.keys()
+        known_phrases = {term_key("phrases", p["english"]) for p in corpus.phrases}
+        known_phrases.update(store.lookup_terms("phrases", found_sentences))
+        candidates = found_words
+        if top_words is not None and found_words:
+            candidates = rank_terms(succeeded, top_words, exclude=known_words)
+        vocabulary = new_items(candidates, known_words, lambda w: {
+            "english": w, "chinese": PENDING_TRANSLATION, "phonetic": "", "example": "", "category": category,
+            "aliases": ALIAS_SEPARATOR.join(aliases.get(w, ())),
+        }, key=canonical_key)
+        phrases = new_items(found_sentences, known_phrases, lambda s: {
+            "english": s, "chinese": PENDING_TRANSLATION, "scenario": scenario,
+        })
+        word_aliases = existing_aliases(found_words, aliases, existing_words, builtin_words)
+        merging = store.alias_updates(word_aliases)
+        added_words = added_phrases = merged_words = 0
+        if not dry_run and (vocabulary or phrases or merging):
+            # 一个事务：要么全部写入，要么全部不写；skip_existing 防止与其他进程同时写入时重复
+            with store.transaction():
+                added_words = store.add_vocabulary(vocabulary, skip_existing=True)
+                added_phrases = store.add_phrases(phrases, skip_existing=True)
+                merged_words = store.add_vocabulary_aliases(word_aliases)
+        totals = {"vocabulary": store.count("vocabulary"), "phrases": store.count("phrases")}
+
+    summary.update(stats)
+    summary.update({
+        "failures": [{"file": r["name"], "error": r["error"]} for r in results if "error" in r],
+        "chars": sum(r["chars"] for r in succeeded),
+        "words_found": len(found_words),
+        "variants_merged": sum(len(forms) for forms in aliases.values()),
+        "words_new": len(vocabulary),
+        "words_added": added_words,
+        "words_alias_pending": len(merging),
+        "words_alias_merged": merged_words,
+        "sentences_found": len(found_sentences),
+        "sentences_truncated": [str(path) for path, r in zip(paths, results) if r.get("sentences_truncated")],
+        "sentences_new": len(phrases),
+        "sentences_added": added_phrases,
+        "custom_totals": totals,
+        "sample_words": [w["english"] for w in vocabulary[:20]],
+        "sample_sentences": [p["english"] for p in phrases[:5]],
+        "seconds": round(time.perf_counter() - started, 3),
+    })
+    return summary
+
+
+def print_summary(summary):
+    print()
+    if "error" in summary:
+        print(f"❌ {summary['error']}")
+        return
+    print(f"📄 文件: {summary['files']} 个（解析 {summary['extracted']}，缓存命中 {summary['cached']}，失败 {summary['failed']}）")
+    print(f"   共 {summary['chars']} 字符，用时 {summary['seconds']:.1f} 秒")
+    for failure in summary["failures"]:
+        print(f"   ⚠️ {failure['file']}: {failure['error']}")
+    verb = "将添加" if summary["dry_run"] else "已添加"
+    added_words = summary["words_new"] if summary["dry_run"] else summary["words_added"]
+    merged_words = summary["words_alias_pending"] if summary["dry_run"] else summary["words_alias_merged"]
+    added_sentences = summary["sentences_new"] if summary["dry_run"] else summary["sentences_added"]
+    print(f"📖 单词: 发现 {summary['words_found']} 个（另有 {summary['variants_merged']} 个词形变化合并为别名），{verb} {added_words} 个")
+    if merged_words:
+        print(f"   {merged_words} 个已有单词的新变形{'将' if summary['dry_run'] else '已'}记为别名")
+    print(f"💬 句子: 发现 {summary['sentences_found']} 个，{verb} {added_sentences} 个")
+    for name in summary["sentences_truncated"]:
+        print(f"   ⚠️ {name}: 句子超过 {SENTENCE_LIMIT} 个，只保留了前 {SENTENCE_LIMIT} 个")
+    if summary["dry_run"]:
+        if summary["sample_words"]:
+            print(f"   新单词示例: {', '.join(summary['sample_words'])}")
+        for sentence in summary["sample_sentences"]:
+            print(f"   新句子示例: {sentence}")
+        print("（试运行，未写入词库）")
+    else:
+        totals = summary["custom_totals"]
+        print(f"📚 自定义词库现有 {totals['vocabulary']} 个单词, {totals['phrases']} 个短语")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量导入 TXT/MD/DOCX 文档到 OTA 英语学习词库")
+    parser.add_argument("patterns", nargs="+", help="文件或通配符（用引号括起来，** 表示递归）")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help=f"数据目录（默认 {DEFAULT_DATA_DIR}）")
+    parser.add_argument("--category", default="导入文档", help="新单词的分类（默认 导入文档）")
+    parser.add_argument("--scenario", default="文档内容", help="新句子的场景（默认 文档内容）")
+    parser.add_argument("--no-words", action="store_true", help="不导入单词")
+    parser.add_argument("--no-sentences", action="store_true", help="不导入句子")
+    parser.add_argument("--top", type=int, default=None, metavar="N", help="只导入相关度最高的 N 个新单词（默认全部）")
+    parser.add_argument("--workers", type=int, default=None, help="提取进程数（默认 CPU 核数）")
+    parser.add_argument("--dry-run", action="store_true", help="只统计，不写入词库")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出汇总（进度信息输出到 stderr）")
+    args = parser.parse_args(argv)
+
+    log = (lambda message: print(message, file=sys.stderr)) if args.json else print
+    summary = run_import(
+        args.patterns, data_dir=args.data_dir, category=args.category, scenario=args.scenario,
+        words=not args.no_words, sentences=not args.no_sentences, top_words=args.top,
+        dry_run=args.dry_run, workers=args.workers, log=log,
+    )
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+    if "error" in summary:
+        return 2
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内置词库
+
+- 词汇和短语保存在 data/builtin_corpus.json，随程序一起发布，扩充词库只需修改数据文件
+- 每个进程只读取一次：Streamlit 每次重跑都会重新执行 app.py，但不会重新导入本模块
+- 读取结果是只读结构（元组 + 只读记录），所有会话共享，不能被意外修改
+- 词汇/短语记录使用 __slots__，分类和场景名做字符串驻留，大词库下内存占用约为字典的三分之一
+- RecordTable 给每个条目一个固定的整数编号，会话中只保存编号而不是条目本身
+"""
+
+import json
+import sys
+import threading
+from array import array
+from pathlib import Path
+
+BUILTIN_CORPUS_FILE = Path(__file__).resolve().parent / "data" / "builtin_corpus.json"
+CORPUS_VERSION = 1
+
+
+class _Record:
+    """只读记录，兼容按键读取（record["english"]、record.get("phonetic")）"""
+
+    __slots__ = ()
+    FIELDS = ()
+    INTERNED = ()
+    OPTIONAL = ()  # 数据文件中可以省略的字段，默认为空字符串
+
+    def __init__(self, **fields):
+        for name in self.FIELDS:
+            value = fields.get(name) or ""
+            if name in self.INTERNED:
+                value = sys.intern(value)
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_dict(cls, item):
+        return cls(**{name: item.get(name) for name in cls.FIELDS})
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 是只读的")
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def keys(self):
+        return self.FIELDS
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(getattr(self, n) == getattr(other, n) for n in self.FIELDS)
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.id!r}, {self.english!r})"
+
+
+class VocabRecord(_Record):
+    FIELDS = ("id", "english", "chinese", "phonetic", "example", "category", "aliases")
+    INTERNED = ("category",)
+    OPTIONAL = ("aliases",)
+    __slots__ = FIELDS
+
+
+class PhraseRecord(_Record):
+    FIELDS = ("id", "english", "chinese", "scenario")
+    INTERNED = ("scenario",)
+    __slots__ = FIELDS
+
+
+class BuiltinCorpus:
+    """只读的内置词库：vocabulary / phrases 为记录元组"""
+
+    __slots__ = ("vocabulary", "phrases")
+
+    def __init__(self, vocabulary, phrases):
+        self.vocabulary = vocabulary
+        self.phrases = phrases
+
+
+def _freeze(items, record_type, kind):
+    frozen = []
+    seen = set()
+    for pos, item in enumerate(items):
+        missing = [field for field in record_type.FIELDS if field not in item and field not in record_type.OPTIONAL]
+        if missing:
+            raise ValueError(f"{kind} 第 {pos + 1} 条缺少字段: {', '.join(missing)}")
+        if item["id"] in seen:
+            raise ValueError(f"{kind} 的 id 重复: {item['id']}")
+        seen.add(item["id"])
+        frozen.append(record_type.from_dict(item))
+    return tuple(frozen)
+
+
+def load_builtin_corpus(path=BUILTIN_CORPUS_FILE):
+    """读取并校验词库文件（每次调用都会读盘，一般应使用 builtin_corpus()）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("version") != CORPUS_VERSION:
+        raise ValueError(f"不支持的词库版本: {data.get('version')}")
+    return BuiltinCorpus(
+        _freeze(data.get("vocabulary", []), VocabRecord, "vocabulary"),
+        _freeze(data.get("phrases", []), PhraseRecord, "phrases"),
+    )
+
+
+_lock = threading.Lock()
+_corpus = None
+
+
+def builtin_corpus():
+    """进程内共享的内置词库（第一次调用时读取）"""
+    global _corpus
+    if _corpus is None:
+        with _lock:
+            if _corpus is None:
+                _corpus = load_builtin_corpus()
+    return _corpus
+
+
+class RecordTable:
+    """进程级条目表：条目 id → 固定的整数编号
+
+    会话中只保存编号（array('I')），使用时经 get()/resolve() 取回当前记录，
+    会话不会持有条目副本，也不会让旧版本的词库一直留在内存中。
+    条目被修改时编号不变、记录替换；被删除后编号作废，get() 返回 None。
+    表由所有会话共享：写入方（持有词库缓存的锁）只做单次赋值或先追加记录再登记编号，
+    读取方不加锁也不会看到半成品。
+    """
+
+    def __init__(self, records=()):
+        self._records = []
+        self._handles = {}
+        self.add(records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, records):
+        """登记记录（已有 id 沿用原编号）"""
+        self._add(self._records, self._handles, records)
+
+    @staticmethod
+    def _add(table, handles, records):
+        for record in records:
+            handle = handles.get(record.id)
+            if handle is None:
+                # 先追加记录再登记编号，读到编号时记录一定已存在
+                table.append(record)
+                handles[record.id] = len(table) - 1
+            else:
+                table[handle] = record
+
+    def remove(self, ids):
+        for item_id in ids:
+            handle = self._handles.get(item_id)
+            if handle is not None:
+                self._records[handle] = None
+
+    def reset(self, records):
+        """以 records 为全部现存条目：不在其中的编号作废，其余沿用
+
+        新表在本地建好后一次赋值发布，其他会话在此期间读到的仍是完整的旧表。
+        先发布记录表再发布编号表：新编号只会在新表中查找。
+        """
+        table = [None] * len(self._records)
+        handles = dict(self._handles)
+        self._add(table, handles, records)
+        self._records = table
+        self._handles = handles
+
+    def handle(self, item_id):
+        handle = self._handles.get(item_id)
+        if handle is None or self._records[handle] is None:
+            return None
+        return handle
+
+    def handles(self, records):
+        """记录列表 → 编号数组"""
+        get = self._handles.__getitem__
+        return array('I', [get(record.id) for record in records])
+
+    def get(self, handle):
+        """编号对应的当前记录，已删除时返回 None"""
+        return self._records[handle]
+
+    def resolve(self, handles):
+        """编号 → 记录，跳过已删除的"""
+        records = self._records
+        return [record for record in (records[h] for h in handles) if record is not None]
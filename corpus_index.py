@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词库索引
+
+- VocabularySearchIndex: 英文 n-gram + 中文 n-gram 倒排索引，用于词汇搜索
+- CategoryIndex: 分类/场景 → 条目 的分桶索引，带计数，支持增量增删
+- DistractorSampler: 测验干扰项抽样（随机 / 相近词）
+"""
+
+import bisect
+import heapq
+import random
+from array import array
+from itertools import chain
+
+from lemma import ALIAS_SEPARATOR, split_aliases
+
+EN_GRAM = 3
+ZH_GRAM = 2
+# 一次追加超过这么多词汇时整体重排前缀表，否则逐个插入
+SORTED_REBUILD_BATCH = 256
+
+
+def _grams(text, n):
+    """text 中所有长度为 1..n 的子串"""
+    return {text[i:i + k] for k in range(1, n + 1) for i in range(len(text) - k + 1)}
+
+
+def _post(postings, keys, pos):
+    """把 pos 追加到每个 key 的倒排表"""
+    get = postings.get
+    for key in keys:
+        posting = get(key)
+        if posting is None:
+            posting = postings[key] = array('I')
+        posting.append(pos)
+
+
+class VocabularySearchIndex:
+    """词汇搜索索引
+
+    每个词汇以其在列表中的位置编号；倒排表用 array 存储以节省内存。
+    - 英文：小写后的 1~3 元组（英文后接别名，搜索变形词也能找到条目）；中文：1~2 元组
+    - 查询不超过 n 个字符时倒排表就是精确结果，更长的查询取最短倒排表再校验子串
+    - 结果按 完全匹配 > 前缀匹配 > 包含 排序，同级按词库顺序；指定 limit 时逐级取满即停
+    - 删除只记下作废的编号（搜索时跳过），不重建索引
+    匹配规则与原线性扫描一致：英文不区分大小写，中文原样匹配。
+    """
+
+    def __init__(self, words=()):
+        self.words = []
+        self._english = []
+        self._chinese = []
+        self._en_postings = {}
+        self._zh_postings = {}
+        self._exact = {}
+        self._sorted = None
+        self._pos_of = {}
+        self._removed = set()
+        self.add(words)
+
+    def __len__(self):
+        return len(self.words) - len(self._removed)
+
+    def add(self, words):
+        """追加词汇（编号依次递增）；id 已存在的词汇视为替换，旧编号作废"""
+        start = len(self.words)
+        for word in words:
+            pos = len(self.words)
+            old = self._pos_of.get(word["id"])
+            if old is not None:
+                self._removed.add(old)
+            self._pos_of[word["id"]] = pos
+            english = word["english"].lower()
+            chinese = word["chinese"]
+            exact = {english, chinese}
+            aliases = word.get("aliases")
+            if aliases:
+                forms = split_aliases(aliases.lower())
+                exact.update(forms)
+                english = ALIAS_SEPARATOR.join([english, *forms])
+            self.words.append(word)
+            self._english.append(english)
+            self._chinese.append(chinese)
+            _post(self._en_postings, _grams(english, EN_GRAM), pos)
+            _post(self._zh_postings, _grams(chinese, ZH_GRAM), pos)
+            _post(self._exact, exact, pos)
+        self._update_sorted(start)
+
+    def remove(self, ids):
+        """删除词汇：编号作废，搜索时跳过"""
+        for item_id in ids:
+            pos = self._pos_of.pop(item_id, None)
+            if pos is not None:
+                self._removed.add(pos)
+
+    def search(self, query, allowed=None, limit=None):
+        """返回匹配的词汇列表；allowed 为编号集合时只返回其中的词汇
+
+        limit 不为 None 时只返回排在最前的 limit 个：先取完全匹配和前缀匹配（数量少），
+        再按编号顺序取包含的，取满即停，不物化全部匹配（单字符查询在大词库中可匹配大半词汇）。
+        """
+        if not query:
+            return []
+        en_query = query.lower()
+        removed = self._removed
+        # 完全匹配、前缀匹配必然也是包含匹配，只需去重和过滤
+        exact = sorted(set(chain(self._exact.get(en_query, ()), self._exact.get(query, ()))))
+        prefix = sorted(chain(self._prefixed(0, en_query), self._prefixed(1, query)))
+        result = []
+        taken = set()
+        for pos in chain(exact, prefix):
+            if pos in taken or pos in removed or (allowed is not None and pos not in allowed):
+                continue
+            taken.add(pos)
+            result.append(pos)
+            if len(result) == limit:
+                return self._resolve(result)
+        en = self._match(en_query, self._english, self._en_postings, EN_GRAM)
+        zh = self._match(query, self._chinese, self._zh_postings, ZH_GRAM)
+        if limit is None:
+            # 需要全部结果时用集合运算（C 实现）比逐个判断快
+            rest = set(en).union(zh) - taken - removed
+            if allowed is not None:
+                rest &= allowed
+            result.extend(sorted(rest))
+            return self._resolve(result)
+        # 其余匹配按编号升序合并两个倒排表，同一编号相邻，跳过重复
+        last = None
+        for pos in heapq.merge(en, zh):
+            if pos == last:
+                continue
+            last = pos
+            if pos in taken or pos in removed or (allowed is not None and pos not in allowed):
+                continue
+            result.append(pos)
+            if len(result) == limit:
+                break
+        return self._resolve(result)
+
+    def _resolve(self, positions):
+        words = self.words
+        return [words[pos] for pos in positions]
+
+    @staticmethod
+    def _match(query, texts, postings, n):
+        """包含 query 的编号（升序）：短查询直接返回倒排表，长查询取最短的倒排表再校验子串"""
+        if len(query) <= n:
+            return postings.get(query, ())
+        shortest = None
+        for i in range(len(query) - n + 1):
+            posting = postings.get(query[i:i + n])
+            if posting is None:
+                return ()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        return [pos for pos in shortest if query in texts[pos]]
+
+    def _prefixed(self, which, query):
+        """以 query 开头的编号（在排序后的文本上二分查找，顺序不定）"""
+        keys, positions = self._sorted[which]
+        lo = bisect.bisect_left(keys, query)
+        hi = bisect.bisect_left(keys, query + "\U0010ffff")
+        return positions[lo:hi]
+
+    def _update_sorted(self, start):
+        """维护前缀查找用的排序表：少量追加逐个插入，否则整体重排（在构建/追加时完成，搜索时不再排序）"""
+        added = len(self.words) - start
+        if self._sorted is None or added > SORTED_REBUILD_BATCH:
+            self._sorted = tuple(self._build_sorted(texts) for texts in (self._english, self._chinese))
+            return
+        for (keys, positions), texts in zip(self._sorted, (self._english, self._chinese)):
+            for pos in range(start, len(self.words)):
+                i = bisect.bisect_right(keys, texts[pos])
+                keys.insert(i, texts[pos])
+                positions.insert(i, pos)
+
+    @staticmethod
+    def _build_sorted(texts):
+        order = sorted(range(len(texts)), key=texts.__getitem__)
+        return [texts[i] for i in order], array('I', order)
+
+
+class CategoryIndex:
+    """分类/场景分桶索引
+
+    每个桶是 {条目id: 条目} 的有序字典，按条目首次出现的顺序排列，
+    因此下拉框顺序稳定；筛选是一次字典查找，增删单个条目为 O(1)。
+    """
+
+    def __init__(self, items=(), field="category"):
+        self.field = field
+        self._buckets = {}
+        self._name_of = {}
+        self.add(items)
+
+    def __len__(self):
+        return len(self._name_of)
+
+    def add(self, items):
+        """加入条目；id 已存在时视为替换，分类变了就移到新的桶"""
+        for item in items:
+            name = item[self.field]
+            old = self._name_of.get(item["id"])
+            if old is not None and old != name:
+                self.remove([item["id"]])
+            self._buckets.setdefault(name, {})[item["id"]] = item
+            self._name_of[item["id"]] = name
+
+    def remove(self, ids):
+        for item_id in ids:
+            name = self._name_of.pop(item_id, None)
+            if name is None:
+                continue
+            bucket = self._buckets[name]
+            del bucket[item_id]
+            if not bucket:
+                del self._buckets[name]
+
+    def names(self):
+        """所有分类名（稳定顺序）"""
+        return list(self._buckets)
+
+    def count(self, name):
+        return len(self._buckets.get(name, ()))
+
+    def items(self, name):
+        """该分类下的条目列表"""
+        return list(self._buckets.get(name, {}).values())
+
+    def contains(self, name, item_id):
+        return item_id in self._buckets.get(name, ())
+
+    def name_of(self, item_id):
+        """条目所在的分类名，不存在时返回 None"""
+        return self._name_of.get(item_id)
+
+    def get(self, item_id):
+        """按 id 取条目，不存在时返回 None"""
+        name = self._name_of.get(item_id)
+        return None if name is None else self._buckets[name][item_id]
+
+
+class DistractorSampler:
+    """测验干扰项抽样，每个词库版本构建一次
+
+    - 随机模式：在（分类的）列表上按下标拒绝采样，每次抽取 O(1)，不复制列表
+    - 困难模式：优先使用相近词（共同汉字、同一分类、英文长度/前缀相近），
+      每个词的相近词在第一次用到时计算并缓存，同一词库版本内不再重复计算
+    干扰项的中文不会与正确答案或彼此重复。
+    """
+
+    NEIGHBOURS = 8
+    POSTING_LIMIT = 256  # 候选过多的汉字/前缀只取前若干个，避免常见字拖慢计算
+
+    def __init__(self, words, categories):
+        self.words = list(words)
+        self.categories = categories
+        self._pools = {}
+        self._char_postings = None
+        self._prefix_postings = None
+        self._neighbours = {}
+
+    def pool(self, category=None):
+        """可抽样的词汇列表（category 为 None 时是全部词汇），每个分类只构建一次"""
+        if category is None:
+            return self.words
+        pool = self._pools.get(category)
+        if pool is None:
+            pool = self._pools[category] = self.categories.items(category)
+        return pool
+
+    def sample(self, word, k=3, category=None, hard=False, rng=random):
+        """为 word 抽取至多 k 个干扰项"""
+        pool = self.pool(category)
+        taken = {word["chinese"]}
+        picks = []
+
+        def take(candidate):
+            if candidate["id"] != word["id"] and candidate["chinese"] not in taken:
+                taken.add(candidate["chinese"])
+                picks.append(candidate)
+
+        if hard:
+            for candidate in self.neighbours(word):
+                if len(picks) >= k:
+                    break
+                if category is None or candidate[self.categories.field] == category:
+                    take(candidate)
+        # 拒绝采样：候选不合格时重抽，限定次数后退化为一次线性筛选
+        attempts = 8 * k + 16
+        while len(picks) < k and attempts:
+            attempts -= 1
+            take(pool[rng.randrange(len(pool))])
+        if len(picks) < k:
+            rest = [w for w in pool if w["id"] != word["id"] and w["chinese"] not in taken]
+            rng.shuffle(rest)
+            for candidate in rest:
+                if len(picks) >= k:
+                    break
+                take(candidate)
+        return picks
+
+    def neighbours(self, word):
+        """与 word 最相近的词汇（按相似度降序）"""
+        cached = self._neighbours.get(word["id"])
+        if cached is None:
+            cached = self._neighbours[word["id"]] = self._compute_neighbours(word)
+        return [self.words[pos] for pos in cached]
+
+    def _compute_neighbours(self, word):
+        if self._char_postings is None:
+            self._build_postings()
+        chinese = set(word["chinese"])
+        english = word["english"].lower()
+        candidates = set()
+        for char in chinese:
+            candidates.update(self._char_postings.get(char, ())[:self.POSTING_LIMIT])
+        candidates.update(self._prefix_postings.get(english[:2], ())[:self.POSTING_LIMIT])
+        category = word.get(self.categories.field)
+        words = self.words
+
+        def score(pos):
+            other = words[pos]
+            other_chinese = set(other["chinese"])
+            other_english = other["english"].lower()
+            shared = len(chinese & other_chinese) / (len(chinese | other_chinese) or 1)
+            prefix = 0
+            for a, b in zip(english[:3], other_english):
+                if a != b:
+                    break
+                prefix += 1
+            length = 1 - abs(len(english) - len(other_english)) / max(len(english), len(other_english), 1)
+            same_category = 1 if other.get(self.categories.field) == category else 0
+            return 3 * shared + same_category + prefix / 3 + length
+
+        candidates = [pos for pos in candidates if words[pos]["id"] != word["id"]]
+        return array('I', heapq.nlargest(self.NEIGHBOURS, candidates, key=score))
+
+    def _build_postings(self):
+        chars, prefixes = {}, {}
+        for pos, word in enumerate(self.words):
+            _post(chars, set(word["chinese"]), pos)
+            _post(prefixes, {word["english"][:2].lower()}, pos)
+        self._char_postings = chars
+        self._prefix_postings = prefixes
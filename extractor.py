@@ -0,0 +1,768 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档解析 - 从文本和 Word 文档中提取英文单词和句子
+
+本模块不依赖 Streamlit，可以被进程池的子进程、命令行工具直接导入。
+单词按 lemma.canonical_key 合并词形变化（flash/flashes/flashing、roll-back/rollback），
+其他写法作为别名保留；提取结果中每个单词还带有出现次数和与内置词库词条同行的比例，
+供 ranking.py 按相关度排序。
+"""
+
+import codecs
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import Counter, OrderedDict
+from itertools import islice
+from pathlib import Path
+
+from corpus import builtin_corpus
+from lemma import canonical_key, prefer_surface
+from perf import span
+
+
+# ==================== 文本提取 ====================
+# 英文单词（包括带下划线、连字符和数字的技术术语），至少 3 个字符
+WORD_PATTERN = re.compile(r'\b[a-zA-Z][a-zA-Z0-9_\-]+[a-zA-Z0-9]\b')
+
+# 过滤的常见词（扩展列表）
+COMMON_WORDS = frozenset({
+    # 冠词、代词、介词、连词
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'had', 'her', 'was', 'one', 'our', 'out', 
+    'has', 'have', 'been', 'will', 'more', 'when', 'who', 'way', 'may', 'its', 'than', 'them', 'then', 'into', 
+    'some', 'could', 'other', 'which', 'their', 'there', 'would', 'about', 'these', 'from', 'with', 'this', 
+    'that', 'what', 'were', 'they', 'each', 'make', 'like', 'just', 'over', 'such', 'also', 'back', 'after', 
+    'most', 'only', 'come', 'made', 'find', 'here', 'many', 'where', 'does', 'being', 'under', 'last', 'right', 
+    'still', 'must', 'own', 'through', 'before', 'same', 'should', 'well', 'between', 'each', 'because', 'very', 
+    'without', 'again', 'off', 'might', 'while', 'never', 'below', 'next', 'few', 'those', 'always', 'both', 
+    'how', 'why', 'any', 'new', 'work', 'first', 'second', 'third', 'part', 'take', 'get', 'place', 'number', 
+    'year', 'day', 'good', 'give', 'use', 'say', 'see', 'know', 'want', 'look', 'think', 'time', 'now', 'people', 
+    'even', 'thing', 'man', 'world', 'life', 'hand', 'high', 'old', 'great', 'big', 'small', 'large', 'long', 
+    'little', 'left', 'early', 'young', 'important', 'public', 'bad', 'able', 'shall', 'need',
+    # 常见动词
+    'show', 'display', 'click', 'select', 'enter', 'input', 'output', 'create', 'delete', 'update', 'read', 
+    'write', 'save', 'load', 'send', 'receive', 'connect', 'disconnect', 'start', 'stop', 'open', 'close',
+    'enable', 'disable', 'true', 'false', 'null', 'none', 'default', 'custom',
+    # 常见名词（保留技术相关的）
+    'user', 'system', 'data', 'information', 'function', 'feature', 'page', 'button', 'file', 'name', 'type', 
+    'value', 'list', 'item', 'table', 'row', 'column', 'field', 'form', 'text', 'image', 'icon', 'menu', 
+    'option', 'setting', 'config', 'parameter', 'result', 'status', 'state', 'mode', 'level', 'size', 
+    'width', 'height', 'color', 'style', 'format', 'content', 'title', 'description', 'note', 'comment', 
+    'message', 'error', 'warning', 'success', 'fail', 'request', 'response'
+})
+
+SCAN_BLOCK_CHARS = 1 << 20
+# 不同片段超过该数量时把片段计数合并进词条统计并清空，日志等片段几乎不重复的文本内存也有上限
+SCAN_FOLD_CHUNKS = 1 << 16
+# 统计单词与内置词库词条共现时只看文档开头的字符数
+COOC_SAMPLE_CHARS = 4 << 20
+# 单词内不会出现的字符：在这里断开超长片段，断开前后找到的单词不变
+_WORD_BREAK = re.compile(r'[^\w\-]')
+_SPACE = re.compile(r'\s')
+
+
+class TermStats:
+    """一个词条的统计：首次出现的写法、出现次数、首次出现位置（第几个空白分隔的词）"""
+
+    __slots__ = ("surface", "count", "first_offset")
+
+    def __init__(self, surface, count, first_offset):
+        self.surface = surface
+        self.count = count
+        self.first_offset = first_offset
+
+    def __repr__(self):
+        return f"TermStats({self.surface!r}, count={self.count}, first_offset={self.first_offset})"
+
+
+class TermScanner:
+    """单遍分词统计
+
+    单词不会跨越空白，因此先按空白切分并统计每个片段的出现次数（C 层完成），
+    正则只需在去重后的片段上各运行一次。文本按块处理，feed 可多次调用，
+    跨次调用被截断的片段会留到下一次拼接。不同片段累积到 fold_chunks 个时
+    先合并进词条统计，内存只与不同词条的数量有关，与文本长度无关。
+    没有空白的超长片段（base64、压缩日志等）留下的部分超过 block_chars 时
+    在最后一个单词内不会出现的字符处断开先处理；连这样的字符也没有时，
+    片段不可能是有效单词，丢弃到下一个空白为止。
+    """
+
+    def __init__(self, stopwords=COMMON_WORDS, block_chars=SCAN_BLOCK_CHARS, fold_chunks=SCAN_FOLD_CHUNKS):
+        self.stopwords = stopwords
+        self.block_chars = block_chars
+        self.fold_chunks = fold_chunks
+        self._counts = Counter()  # 片段 → 次数，按首次出现排序
+        self._first = {}          # 片段 → 首次出现位置
+        self._terms = {}          # 已合并的词条统计
+        self._words = 0
+        self._carry = ""
+        self._skipping = False
+
+    def feed(self, text):
+        """追加一段文本（可以在任意位置截断）"""
+        if self._skipping:
+            m = _SPACE.search(text)
+            if m is None:
+                return
+            text = text[m.start():]
+            self._skipping = False
+        if self._carry:
+            text = self._carry + text
+        # 从末尾找最后一个空白（反转后用正则在 C 层查找，没有空白的长文本也不会逐字符循环）
+        m = _SPACE.search(text[::-1])
+        cut = 0 if m is None else len(text) - m.start()
+        self._carry = text[cut:]
+        start = 0
+        while start < cut:
+            end = min(cut, start + self.block_chars)
+            while end < cut and not text[end].isspace():
+                end += 1
+            self._count_block(text[start:end])
+            start = end
+            if len(self._counts) >= self.fold_chunks:
+                self._fold()
+        if len(self._carry) >= self.block_chars:
+            self._split_carry()
+
+    def _split_carry(self):
+        """处理超长的未结束片段，只留下最后一个单词内不会出现的字符之后的部分"""
+        carry = self._carry
+        # 至少留下一个字符，后续文本才会接在它后面，与前一部分算作同一个空白分隔的词
+        m = _WORD_BREAK.search(carry[-2::-1])
+        if m is None:
+            self._carry = ""
+            self._skipping = True
+            self._words += 1
+            return
+        cut = len(carry) - 1 - m.start()
+        self._count_block(carry[:cut])
+        self._words -= 1
+        self._carry = carry[cut:]
+        if len(self._counts) >= self.fold_chunks:
+            self._fold()
+
+    def _count_block(self, block):
+        chunks = block.split()
+        counts = self._counts
+        before = len(counts)
+        counts.update(chunks)
+        # 新片段按首次出现顺序排在末尾，它们在 chunks 中的位置单调递增
+        index = chunks.index
+        pos = 0
+        first = self._first
+        for chunk in islice(counts, before, None):
+            pos = index(chunk, pos)
+            first[chunk] = self._words + pos
+        self._words += len(chunks)
+
+    @property
+    def tokens(self):
+        """已处理的词数（按空白切分）"""
+        return self._words
+
+    def terms(self):
+        """{小写词: TermStats}，按首次出现排序，已过滤常见词"""
+        if self._carry:
+            self._count_block(self._carry)
+            self._carry = ""
+        self._fold()
+        return self._terms
+
+    def _fold(self):
+        """把片段计数合并进词条统计（后合并的片段都出现在之前合并的之后，顺序不变）"""
+        terms = self._terms
+        get = terms.get
+        findall = WORD_PATTERN.findall
+        stopwords = self.stopwords
+        first = self._first
+        for chunk, count in self._counts.items():
+            for word in findall(chunk):
+                lower = word.lower()
+                stats = get(lower)
+                if stats is not None:
+                    stats.count += count
+                elif lower not in stopwords:
+                    terms[lower] = TermStats(word, count, first[chunk])
+        self._counts = Counter()
+        self._first = {}
+
+
+def scan_terms(text, stopwords=COMMON_WORDS):
+    """统计文本中的英文词条，返回 {小写词: TermStats}"""
+    scanner = TermScanner(stopwords)
+    scanner.feed(text)
+    return scanner.terms()
+
+
+def group_variants(terms):
+    """把 {小写词: TermStats} 按规范键分组，返回 {规范键: [(小写词, TermStats), ...]}，按首次出现排序"""
+    groups = {}
+    for lower, stats in terms.items():
+        key = canonical_key(stats.surface)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = [(lower, stats)]
+        else:
+            group.append((lower, stats))
+    return groups
+
+
+def _display_surface(group):
+    surface = group[0][1].surface
+    for _, stats in group[1:]:
+        surface = prefer_surface(surface, stats.surface)
+    return surface
+
+
+def extract_words_from_text(text):
+    """从文本中提取英文单词（按规范键去重，同一个词的变形只保留一个写法，过滤常见词）"""
+    return [_display_surface(group) for group in group_variants(scan_terms(text)).values()]
+
+def extract_sentences_from_text(text):
+    """从文本中提取英文句子（去重）"""
+    scanner = SentenceScanner()
+    scanner.feed(text)
+    return scanner.finish()
+
+
+# 按句号、问号、感叹号分割；保留长度在 (20, 300) 之间、一半以上是英文字母的句子
+SENTENCE_SPLIT = re.compile(r'[.!?]+')
+SENTENCE_MIN_CHARS = 20
+SENTENCE_MAX_CHARS = 300
+# 每个文件最多保留的句子数：日志等超大文本中不重复的"句子"可达数十万，全部保留既占内存也没有意义
+SENTENCE_LIMIT = 50_000
+_ASCII_LETTER = re.compile(r'[a-zA-Z]')
+
+
+class SentenceScanner:
+    """分块提取句子：feed 可以在任意位置截断文本，最后一个未结束的句子留到下一次拼接
+
+    结果与对整段文本调用 extract_sentences_from_text 相同。未结束的部分超过
+    SENTENCE_MAX_CHARS 时一定会被过滤，直接丢弃到下一个句末标点，不会无限增长；
+    收集到 limit 个句子后又遇到新句子时记下 truncated，不再处理后续文本。
+    """
+
+    def __init__(self, limit=SENTENCE_LIMIT):
+        self.limit = limit
+        self.sentences = []
+        self.truncated = False
+        self._seen = set()
+        self._carry = ""
+        self._skipping = False
+
+    def feed(self, text):
+        if self.truncated:
+            return
+        if self._skipping:
+            m = SENTENCE_SPLIT.search(text)
+            if m is None:
+                return
+            text = text[m.start():]
+            self._skipping = False
+        pieces = SENTENCE_SPLIT.split(self._carry + text if self._carry else text)
+        self._carry = pieces.pop()
+        for piece in pieces:
+            self._add(piece)
+        # 去掉首尾空白后的长度只会随着拼接增加
+        if len(self._carry) >= SENTENCE_MAX_CHARS and len(self._carry.strip()) >= SENTENCE_MAX_CHARS:
+            self._carry = ""
+            self._skipping = True
+
+    @property
+    def full(self):
+        return self.limit is not None and len(self.sentences) >= self.limit
+
+    def finish(self):
+        """处理最后一个句子并返回全部句子"""
+        if self._carry and not self.truncated:
+            self._add(self._carry)
+            self._carry = ""
+        return self.sentences
+
+    def _add(self, sentence):
+        if self.truncated:
+            return
+        sentence = sentence.strip()
+        if not SENTENCE_MIN_CHARS < len(sentence) < SENTENCE_MAX_CHARS:
+            return
+        lower = sentence.lower()
+        # 只保留主要是英文的句子（超过 50% 是英文字母）
+        if len(_ASCII_LETTER.findall(sentence)) > len(sentence) * 0.5 and lower not in self._seen:
+            if self.full:
+                self.truncated = True
+                return
+            self._seen.add(lower)
+            self.sentences.append(sentence)
+
+
+_anchors_lock = threading.Lock()
+_anchors = None
+
+
+def domain_anchors():
+    """内置词库中的单词（小写，拆开多词词条并去掉常见词），作为判断领域相关的锚点"""
+    global _anchors
+    if _anchors is None:
+        with _anchors_lock:
+            if _anchors is None:
+                anchors = set()
+                for item in builtin_corpus().vocabulary:
+                    anchors.update(w.lower() for w in WORD_PATTERN.findall(item["english"]))
+                _anchors = frozenset(anchors - COMMON_WORDS)
+    return _anchors
+
+
+class CooccurrenceScanner:
+    """统计每个单词出现在多少行（Word 文档中为段落），以及其中多少行含有锚点词
+
+    与 TermScanner 相同，先统计每个（小写）行的出现次数，正则只在去重后的
+    行上运行；不同的行累积到 fold_lines 个时合并进单词计数。只统计文档开头的
+    sample_chars 个字符：比例用样本估计已经足够，超大文档的耗时也有上限。
+    文本可以在任意位置截断，没有换行的超长行达到 max_chars 后直接处理。
+    锚点词本身和常见词不计数。
+    """
+
+    def __init__(self, anchors, stopwords=COMMON_WORDS, sample_chars=COOC_SAMPLE_CHARS,
+                 max_chars=SCAN_BLOCK_CHARS, fold_lines=SCAN_FOLD_CHUNKS):
+        self.anchors = anchors
+        self.excluded = anchors | stopwords
+        self.sample_chars = sample_chars
+        self.max_chars = max_chars
+        self.fold_lines = fold_lines
+        self.lines = Counter()     # 小写词 → 所在行数
+        self.together = Counter()  # 小写词 → 所在行中含有锚点词的行数
+        self._pending = Counter()
+        self._chars = 0
+        self._carry = ""
+
+    def feed(self, text):
+        if self._chars >= self.sample_chars:
+            return
+        text = text[:self.sample_chars - self._chars]
+        self._chars += len(text)
+        lines = (self._carry + text.lower() if self._carry else text.lower()).split('\n')
+        self._carry = lines.pop()
+        if len(self._carry) >= self.max_chars:
+            lines.append(self._carry)
+            self._carry = ""
+        self._pending.update(lines)
+        if len(self._pending) >= self.fold_lines:
+            self._fold()
+
+    def finish(self):
+        """处理最后一行，返回 (所在行数, 与锚点词同行的行数)，都是 {小写词: 行数}"""
+        if self._carry:
+            self._pending[self._carry] += 1
+            self._carry = ""
+        self._fold()
+        return self.lines, self.together
+
+    def _fold(self):
+        findall = WORD_PATTERN.findall
+        anchors = self.anchors
+        excluded = self.excluded
+        lines = self.lines
+        together = self.together
+        for line, n in self._pending.items():
+            words = set(findall(line))
+            anchored = not anchors.isdisjoint(words)
+            for word in words - excluded:
+                lines[word] += n
+                if anchored:
+                    together[word] += n
+        self._pending = Counter()
+
+
+# ==================== Word 文档 ====================
+# Word 文档 XML 中的标签（w: 正文/页眉页脚/文本框，a: 形状/SmartArt 中的 DrawingML 文本）
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_DOCX_PARAGRAPH_TAGS = {_W_NS + "p", _A_NS + "p"}
+_DOCX_TEXT_TAGS = {_W_NS + "t", _A_NS + "t"}
+_DOCX_TAB_TAGS = {_W_NS + "tab", _W_NS + "ptab"}
+_DOCX_BREAK_TAGS = {_W_NS + "br", _W_NS + "cr", _A_NS + "br"}
+_DOCX_TEXT_PARTS = re.compile(r'^word/(?:(header|footer)(\d*)|(footnotes|endnotes)|diagrams/data(\d*))\.xml$')
+
+
+def _docx_text_parts(names):
+    """按顺序列出包含文本的 XML 部件：正文、页眉、页脚、脚注、尾注、SmartArt"""
+    order = {"header": 1, "footer": 2, "footnotes": 3, "endnotes": 4}
+    parts = []
+    for name in names:
+        m = _DOCX_TEXT_PARTS.match(name)
+        if m:
+            kind = m.group(1) or m.group(3) or "diagrams"
+            number = m.group(2) or m.group(4) or "0"
+            parts.append((order.get(kind, 5), int(number), name))
+    return ["word/document.xml"] + [name for _, _, name in sorted(parts)]
+
+
+def _iter_xml_paragraphs(stream):
+    """增量解析一个 XML 部件，每个段落结束时产出其文本，解析过的元素立即释放"""
+    # 文本框里的段落嵌套在外层段落的 run 中，所以用栈保存未结束的段落
+    stack = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag in _DOCX_PARAGRAPH_TAGS:
+                stack.append([])
+            continue
+        if not stack:
+            continue
+        if tag in _DOCX_TEXT_TAGS:
+            stack[-1].append(elem.text or "")
+        elif tag in _DOCX_TAB_TAGS:
+            stack[-1].append("\t")
+        elif tag in _DOCX_BREAK_TAGS:
+            stack[-1].append("\n")
+        elif tag in _DOCX_PARAGRAPH_TAGS:
+            text = "".join(stack.pop()).strip()
+            elem.clear()
+            if text:
+                yield text
+
+
+def iter_docx_paragraphs(source):
+    """流式读取 DOCX 压缩包中的 XML 部件，按文档顺序逐段产出文本
+
+    source 可以是文件路径或二进制文件对象；正文中的表格、嵌套表格、
+    文本框、形状都按出现位置输出，随后是页眉、页脚、脚注和尾注。
+    """
+    with zipfile.ZipFile(source) as zf:
+        for name in _docx_text_parts(zf.namelist()):
+            with zf.open(name) as f:
+                yield from _iter_xml_paragraphs(f)
+
+
+def extract_docx_content(file_bytes):
+    """深度提取Word文档内容，包括所有展开的章节、表格、文本框和页眉页脚"""
+    try:
+        # 流式解析 + 哈希集合去重，保持文档顺序
+        seen = set()
+        all_text = []
+        for text in iter_docx_paragraphs(io.BytesIO(file_bytes)):
+            if text not in seen:
+                seen.add(text)
+                all_text.append(text)
+        return '\n'.join(all_text)
+    except (zipfile.BadZipFile, KeyError, ET.ParseError):
+        return _extract_docx_content_python_docx(file_bytes)
+
+
+def _extract_docx_content_python_docx(file_bytes):
+    """用 python-docx 提取Word文档内容（流式解析失败时的后备方案）"""
+    from docx import Document
+    from docx.oxml.ns import qn
+    
+    doc = Document(io.BytesIO(file_bytes))
+    all_text = []
+    
+    # 1. 提取所有段落（包括标题、正文等）
+    for para in doc.paragraphs:
+        text = para.text.strip()
+        if text:
+            all_text.append(text)
+    
+    # 2. 提取所有表格内容（深度遍历每个单元格）
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                # 单元格可能包含多个段落
+                for para in cell.paragraphs:
+                    cell_text = para.text.strip()
+                    if cell_text:
+                        all_text.append(cell_text)
+                # 单元格内可能还有嵌套表格
+                for nested_table in cell.tables:
+                    for nested_row in nested_table.rows:
+                        for nested_cell in nested_row.cells:
+                            for para in nested_cell.paragraphs:
+                                if para.text.strip():
+                                    all_text.append(para.text.strip())
+    
+    # 3. 尝试提取文本框和形状中的文本
+    try:
+        for shape in doc.inline_shapes:
+            if hasattr(shape, '_inline'):
+                pass
+    except:
+        pass
+    
+    # 4. 提取页眉页脚
+    try:
+        for section in doc.sections:
+            if section.header:
+                for para in section.header.paragraphs:
+                    if para.text.strip():
+                        all_text.append(para.text.strip())
+            if section.footer:
+                for para in section.footer.paragraphs:
+                    if para.text.strip():
+                        all_text.append(para.text.strip())
+    except:
+        pass
+    
+    # 5. 尝试从XML中提取所有文本（捕获可能遗漏的内容）
+    try:
+        from docx.oxml.ns import qn
+        seen = set(all_text)
+        body = doc.element.body
+        for elem in body.iter():
+            if elem.text and elem.text.strip():
+                text = elem.text.strip()
+                if text not in seen:
+                    seen.add(text)
+                    all_text.append(text)
+            if elem.tail and elem.tail.strip():
+                text = elem.tail.strip()
+                if text not in seen:
+                    seen.add(text)
+                    all_text.append(text)
+    except:
+        pass
+    
+    return '\n'.join(all_text)
+
+
+# ==================== 批量提取 ====================
+# 文本文件每次读取并解码的字节数；峰值内存与该值和结果大小有关，与文件大小无关
+TEXT_CHUNK_BYTES = 1 << 20
+
+
+def iter_text_chunks(stream, chunk_bytes=TEXT_CHUNK_BYTES):
+    """从二进制流中分块读取并增量解码 UTF-8（多字节字符被截断时留到下一块）"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def extract_chunks(chunks):
+    """从文本块序列中提取单词和句子，每块处理完即可释放
+
+    结果中 aliases、counts、lines、cooc 与 words 一一对应：合并进来的其他写法、
+    出现次数（含各写法）、在开头样本中所在的行数、其中含有内置词库词条的行数；
+    tokens 为文档总词数；sentences_truncated 表示句子超过 SENTENCE_LIMIT 个、后面的被丢弃。
+    """
+    terms = TermScanner()
+    sentences = SentenceScanner()
+    cooccurrence = CooccurrenceScanner(domain_anchors())
+    chars = 0
+    for text in chunks:
+        chars += len(text)
+        terms.feed(text)
+        sentences.feed(text)
+        cooccurrence.feed(text)
+    lines, together = cooccurrence.finish()
+    result = {"chars": chars, "words": [], "aliases": [], "counts": [], "lines": [], "cooc": []}
+    for group in group_variants(terms.terms()).values():
+        surface = _display_surface(group)
+        result["words"].append(surface)
+        result["aliases"].append([stats.surface for _, stats in group if stats.surface != surface])
+        result["counts"].append(sum(stats.count for _, stats in group))
+        result["lines"].append(sum(lines.get(lower, 0) for lower, _ in group))
+        result["cooc"].append(sum(together.get(lower, 0) for lower, _ in group))
+    result["tokens"] = terms.tokens
+    result["sentences"] = sentences.finish()
+    result["sentences_truncated"] = sentences.truncated
+    return result
+
+
+def extract_stream(name, stream):
+    """提取一个文件（二进制流）的单词和句子
+
+    文本文件边读边解码边提取，不会把整个文件解码成一个字符串；
+    Word 文档需要随机访问压缩包，按原方式解析出正文后再分块提取。
+    """
+    # 在进程池中运行时没有正在记录的重跑，span 不计时
+    if name.lower().endswith('.docx'):
+        with span("extract.docx"):
+            content = extract_docx_content(stream.read())
+        chunks = (content[i:i + TEXT_CHUNK_BYTES] for i in range(0, len(content), TEXT_CHUNK_BYTES))
+    else:
+        chunks = iter_text_chunks(stream)
+    with span("extract.text"):
+        result = extract_chunks(chunks)
+    result["name"] = name
+    return result
+
+
+def extract_file(name, data):
+    """提取单个文件的单词和句子（进程池任务，参数和返回值都可序列化）"""
+    return extract_stream(name, io.BytesIO(data))
+
+
+def extract_path(path):
+    """按路径提取（进程池任务）：文本文件直接从磁盘流式读取"""
+    path = Path(path)
+    with open(path, 'rb') as f:
+        return extract_stream(path.name, f)
+
+
+def merge_extractions(results):
+    """按给定顺序合并多个文件的提取结果，返回 (单词, 句子, {单词: [别名]})
+
+    单词按规范键全局去重，各文件中的不同写法合并为一个单词的别名；句子不区分大小写去重。
+    """
+    groups = {}  # 规范键 → 各写法（按出现顺序，不区分大小写去重）
+    sentences = []
+    seen_sentences = set()
+    for result in results:
+        words = result.get("words", [])
+        for word, variants in zip(words, result.get("aliases") or [()] * len(words)):
+            key = canonical_key(word)
+            forms = groups.get(key)
+            if forms is None:
+                groups[key] = [word, *variants]
+            else:
+                known = {form.lower() for form in forms}
+                forms.extend(form for form in (word, *variants) if form.lower() not in known)
+        for sentence in result.get("sentences", []):
+            lower = sentence.lower()
+            if lower not in seen_sentences:
+                seen_sentences.add(lower)
+                sentences.append(sentence)
+    words = []
+    aliases = {}
+    for forms in groups.values():
+        surface = forms[0]
+        for form in forms[1:]:
+            surface = prefer_surface(surface, form)
+        words.append(surface)
+        if len(forms) > 1:
+            aliases[surface] = [form for form in forms if form != surface]
+    return words, sentences, aliases
+
+
+# ==================== 提取结果缓存 ====================
+# 提取逻辑（分词、句子切分、Word 解析、结果字段）变化时递增，使旧的缓存结果失效
+EXTRACTOR_VERSION = 6
+RESULT_FIELDS = ("chars", "words", "aliases", "counts", "lines", "cooc", "tokens", "sentences", "sentences_truncated")
+
+_anchors_digest = None
+
+
+def _key_digest(name):
+    # 共现次数与内置词库有关，词库变化后旧结果也要失效
+    global _anchors_digest
+    if _anchors_digest is None:
+        _anchors_digest = hashlib.sha256("\n".join(sorted(domain_anchors())).encode("utf-8")).hexdigest()[:16]
+    kind = b"docx" if name.lower().endswith('.docx') else b"text"
+    return hashlib.sha256(b"%d:%s:%s:" % (EXTRACTOR_VERSION, kind, _anchors_digest.encode("ascii")))
+
+
+def content_key(name, data):
+    """提取结果的缓存键：提取器版本 + 文件类型 + 内置词库锚点 + 内容的 SHA-256（与文件名无关）"""
+    digest = _key_digest(name)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def file_content_key(path, chunk_bytes=TEXT_CHUNK_BYTES):
+    """与 content_key 相同的缓存键，分块读取文件计算"""
+    path = Path(path)
+    digest = _key_digest(path.name)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """按内容哈希缓存提取结果
+
+    - 内存中最多保留 max_entries 个结果（LRU）
+    - 指定 spill_dir 时结果同时写入磁盘，进程重启或被挤出内存后仍可命中；
+      磁盘上最多保留 max_disk_entries 个文件，按最近使用时间淘汰
+    线程安全，可在多个会话间共享。
+    """
+
+    def __init__(self, max_entries=16, spill_dir=None, max_disk_entries=256):
+        self.max_entries = max_entries
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key):
+        """返回缓存的结果（不含文件名），未命中返回 None"""
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                return result
+        result = self._read_spill(key)
+        if result is not None:
+            with self._lock:
+                self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        """缓存一个提取结果（extract_file 的返回值，文件名不保存）"""
+        result = {k: result[k] for k in RESULT_FIELDS}
+        with self._lock:
+            self._remember(key, result)
+        self._write_spill(key, result)
+        return result
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------- 磁盘 ----------
+    def _spill_path(self, key):
+        return self.spill_dir / f"{key}.json"
+
+    def _read_spill(self, key):
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)  # 记录最近使用时间，供淘汰使用
+        except (OSError, ValueError):
+            return None
+        return result
+
+    def _write_spill(self, key, result):
+        if self.spill_dir is None:
+            return
+        # 磁盘缓存只是加速手段，写入失败时忽略
+        try:
+            path = self._spill_path(key)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._prune_spill()
+        except OSError:
+            pass
+
+    def _prune_spill(self):
+        files = list(self.spill_dir.glob("*.json"))
+        if len(files) <= self.max_disk_entries:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词形归一 - 把同一个词的不同写法映射到同一个规范键
+
+- 分隔符折叠：连字符、下划线、斜杠和空白去掉，roll-back / roll_back / rollback 相同
+- 词形还原：只处理屈折变化（复数、过去式、进行时），用 Porter 词干算法的第 1 步和第 5 步，
+  flash / flashes / flashed / flashing 相同；不处理 -tion、-ment 等派生后缀，避免把不同的词合并
+- 复数按 Porter2 的规则：-ies → -ie / -i（tie / ties、cry / cries），s、x、zz、ch、sh 后的 -es 整个去掉
+  （bus / buses、box / boxes），-us、-ss 结尾和 gas 这类词不去 s
+- 两个字母以上的全大写缩写不做还原，保留大写作为独立的键，只去掉复数的小写 s
+  （ECUs → ECU；US 与 us / use、CAN 与 can 的键不同）
+- 规范键只用于去重和查找，不用于显示；显示用的写法由 prefer_surface 选择
+
+纯规则实现，不需要网络和词典文件；本模块不依赖 Streamlit。
+"""
+
+import re
+from functools import lru_cache
+
+_SEPARATORS = re.compile(r'[\s\-_/]+')
+_VOWELS = frozenset("aeiou")
+# 去掉整个 -es 的复数词尾（其余复数只去 s）
+_ES_PLURALS = ("sses", "uses", "xes", "zzes", "ches", "shes")
+
+
+def _is_consonant(word, i):
+    ch = word[i]
+    if ch in _VOWELS:
+        return False
+    if ch == 'y':
+        return i == 0 or not _is_consonant(word, i - 1)
+    return True
+
+
+def _measure(stem):
+    """Porter 的 m：词干中 元音串+辅音串 出现的次数"""
+    m = 0
+    previous_vowel = False
+    for i in range(len(stem)):
+        consonant = _is_consonant(stem, i)
+        if consonant and previous_vowel:
+            m += 1
+        previous_vowel = not consonant
+    return m
+
+
+def _has_vowel(stem):
+    return any(not _is_consonant(stem, i) for i in range(len(stem)))
+
+
+def _double_consonant(word):
+    return len(word) >= 2 and word[-1] == word[-2] and _is_consonant(word, len(word) - 1)
+
+
+def _short_syllable(word):
+    """以短音节结尾：辅音-元音-辅音（最后的辅音不是 w、x、y），或整个词是 元音-辅音（Porter2，如 us）"""
+    if len(word) == 2:
+        return not _is_consonant(word, 0) and _is_consonant(word, 1)
+    return (
+        len(word) >= 3
+        and _is_consonant(word, len(word) - 3)
+        and not _is_consonant(word, len(word) - 2)
+        and _is_consonant(word, len(word) - 1)
+        and word[-1] not in "wxy"
+    )
+
+
+def stem(word):
+    """小写单词的屈折词干（Porter 第 1a、1b、1c、5a、5b 步），短于 3 个字母的不处理"""
+    if len(word) < 3 or not word.isalpha():
+        return word
+    # 1a: 复数（及 -ied）
+    if word.endswith(("ies", "ied")):
+        word = word[:-1] if len(word) == 4 else word[:-2]
+    elif word.endswith(_ES_PLURALS) and word != "uses":
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("us", "ss")) and _has_vowel(word[:-2]):
+        # s 前面隔一个字母以上还有元音才去掉：gaps → gap，gas、this 不变
+        word = word[:-1]
+    # 1b: 过去式、进行时
+    if word.endswith("eed"):
+        if _measure(word[:-3]) > 0:
+            word = word[:-1]
+    else:
+        for suffix in ("ed", "ing"):
+            if word.endswith(suffix) and _has_vowel(word[:-len(suffix)]):
+                word = word[:-len(suffix)]
+                if word.endswith(("at", "bl", "iz")):
+                    word += "e"
+                elif _double_consonant(word) and word[-1] not in "lsz":
+                    word = word[:-1]
+                elif _measure(word) == 1 and _short_syllable(word):
+                    word += "e"
+                break
+    # 1c: 辅音后的词尾 y（Porter2），与 -ies 去掉后的结果一致：cry / cries
+    if len(word) > 2 and word.endswith("y") and word[-2] not in _VOWELS and word[-2] != "y":
+        word = word[:-1] + "i"
+    # 5a、5b: 词尾 e 和双写 l，使 update / updated、install / installs 一致
+    if word.endswith("e"):
+        m = _measure(word[:-1])
+        if m > 1 or (m == 1 and not _short_syllable(word[:-1])):
+            word = word[:-1]
+    if word.endswith("ll") and _measure(word) > 1:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=1 << 16)
+def canonical_key(term):
+    """词条的规范键：按分隔符拆开，各部分小写并还原后拼接"""
+    parts = []
+    for part in _SEPARATORS.split(term.strip()):
+        if not part:
+            continue
+        # 缩写保留大写：普通单词的键都是小写，两者不会相同
+        if len(part) > 1 and part.isupper():
+            parts.append(part)
+        elif len(part) > 2 and part[-1] == "s" and part[:-1].isupper():
+            parts.append(part[:-1])
+        else:
+            parts.append(stem(part.lower()))
+    return "".join(parts)
+
+
+def prefer_surface(current, candidate):
+    """同一规范键的两种写法中用于显示的一个：较短的（通常是原形），一样长时保留 current"""
+    return candidate if len(candidate) < len(current) else current
+
+
+# ==================== 别名 ====================
+# 合并到同一条目的其他写法保存在条目的 aliases 字段中，以逗号分隔
+ALIAS_SEPARATOR = ", "
+
+
+def split_aliases(text):
+    return [form.strip() for form in (text or "").split(",") if form.strip()]
+
+
+def merge_aliases(english, aliases, forms):
+    """把 forms 并入别名文本（与 english 或已有别名只差大小写的不重复添加），返回新的别名文本"""
+    merged = split_aliases(aliases)
+    seen = {english.lower(), *(form.lower() for form in merged)}
+    for form in forms:
+        lower = form.lower()
+        if lower not in seen:
+            seen.add(lower)
+            merged.append(form)
+    return ALIAS_SEPARATOR.join(merged)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑列表的 HTML 拼装
+
+一整页条目拼成一个 HTML 块，由 app.py 用一条 st.markdown 发送：
+- 详情用 <details> 在浏览器端展开，朗读按钮由共享语音组件响应（data-tts 属性）
+- 嵌入的文本都先把换行和连续空白合并为一个空格再转义：Markdown 中的 HTML 块遇到空行就会结束，
+  导入文档中跨行的句子会让后面的内容按 Markdown 原文显示
+
+本模块不依赖 Streamlit。
+"""
+
+import html
+import json
+
+
+def inline(text):
+    """单行显示的文本：空白合并为一个空格，并做 HTML 转义"""
+    return html.escape(" ".join(str(text).split()))
+
+
+def tts_parts(english, chinese=None):
+    """朗读内容：英文，可选地接着读中文（返回可直接放进 HTML 属性的 JSON）"""
+    parts = [{"text": " ".join(english.split()), "lang": "en-US", "rate": 0.7}]
+    if chinese:
+        parts.append({"text": " ".join(chinese.split()), "lang": "zh-CN", "rate": 0.75})  # 中文稍快一点
+    return html.escape(json.dumps(parts, ensure_ascii=False), quote=True)
+
+
+def speak_button_html(text, chinese=None, label="🔊"):
+    return f'<button class="speak-btn" data-tts="{tts_parts(text, chinese)}">{label}</button>'
+
+
+def vocabulary_list_html(words, mastery):
+    """一页词汇的 HTML 块（单行）"""
+    rows = []
+    for word in words:
+        level = mastery.get(word["id"], 0)
+        details = []
+        if word.get("phonetic"):
+            details.append(f'<div><b>发音:</b> {inline(word["phonetic"])}</div>')
+        if word.get("aliases"):
+            details.append(f'<div><b>变形:</b> {inline(word["aliases"])}</div>')
+        details.append(f'<div><b>分类:</b> {inline(word["category"])}</div>')
+        if word.get("example"):
+            details.append(
+                f'<div><b>例句:</b> {inline(word["example"])} {speak_button_html(word["example"], label="🔊 例句")}</div>'
+            )
+        details.append(
+            f'<div class="mastery-bar"><div style="width: {level}%;"></div></div>'
+            f'<div class="item-note">掌握程度: {level}%</div>'
+        )
+        rows.append(
+            f'<details class="item-row"><summary><b>{inline(word["english"])}</b> - {inline(word["chinese"])}'
+            f'{speak_button_html(word["english"], word["chinese"])}</summary>'
+            f'<div class="item-detail">{"".join(details)}</div></details>'
+        )
+    return f'<div class="item-list">{"".join(rows)}</div>'
+
+
+def phrase_list_html(phrases):
+    """一页短语的 HTML 块（单行）"""
+    rows = [
+        f'<div class="item-row"><div><b>{inline(p["english"])}</b>{speak_button_html(p["english"], p["chinese"])}</div>'
+        f'<div>{inline(p["chinese"])}</div><div class="item-note">📍 {inline(p["scenario"])}</div></div>'
+        for p in phrases
+    ]
+    return f'<div class="item-list">{"".join(rows)}</div>'
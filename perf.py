@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能埋点
+
+- 每次重跑开始时 begin()，结束时 finish()；其间任意位置用 `with span("名称"):` 或 @timed("名称") 计时
+- 同名 span 在一次重跑内累加耗时和次数；嵌套的 span 各自计时（外层包含内层）
+- 未启用（没有调用 begin）时 span() 直接返回共享的空上下文，开销只有一次线程局部变量读取
+- PerfLog 把每次重跑的结果追加到 JSON lines 日志，并在内存中保留各页面最近的耗时，用于计算 p50/p95
+
+离线统计日志: python perf.py ~/.ota_english/perf.log
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+PERF_LOG_MAX_BYTES = 5 * 1024 * 1024  # 超过后轮转为 perf.log.1
+RECENT_RUNS = 500  # 每个页面在内存中保留的最近重跑次数
+
+_local = threading.local()
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("_run", "_name", "_start")
+
+    def __init__(self, run, name):
+        self._run = run
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._run.add(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class PerfRun:
+    """一次重跑的计时结果：span 名称 → [累计秒数, 次数]"""
+
+    __slots__ = ("page", "start", "spans")
+
+    def __init__(self, page=None):
+        self.page = page
+        self.start = time.perf_counter()
+        self.spans = {}
+
+    def add(self, name, seconds):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def record(self, outcome="ok"):
+        """可写入日志的字典，耗时单位为毫秒"""
+        return {
+            "ts": round(time.time(), 3),
+            "page": self.page,
+            "outcome": outcome,
+            "total_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "spans": {name: [round(s * 1000, 3), n] for name, (s, n) in self.spans.items()},
+        }
+
+
+def begin(page=None):
+    """开始记录当前线程（当前会话的这次重跑）的 span"""
+    run = _local.run = PerfRun(page)
+    return run
+
+
+def current():
+    """当前线程正在记录的 PerfRun，未启用时为 None"""
+    return getattr(_local, "run", None)
+
+
+def set_page(page):
+    run = current()
+    if run is not None:
+        run.page = page
+
+
+def finish(outcome="ok"):
+    """结束记录并返回结果字典；没有在记录时返回 None"""
+    run = current()
+    if run is None:
+        return None
+    _local.run = None
+    return run.record(outcome)
+
+
+def span(name):
+    """计时上下文：with span("storage.load"): ..."""
+    run = getattr(_local, "run", None)
+    if run is None:
+        return _NULL_SPAN
+    return _Span(run, name)
+
+
+def timed(name):
+    """装饰器：把整个函数调用记为一个 span"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            run = getattr(_local, "run", None)
+            if run is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                run.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def percentile(values, p):
+    """最近秩法百分位数，values 为空时返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+class PerfLog:
+    """进程级性能日志：追加 JSON lines，并按页面保留最近的重跑耗时"""
+
+    def __init__(self, path, max_bytes=PERF_LOG_MAX_BYTES, recent=RECENT_RUNS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._recent = defaultdict(lambda: deque(maxlen=recent))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def add(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._recent[record.get("page")].append(record["total_ms"])
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                    size = f.tell()
+                if size >= self.max_bytes:
+                    os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            except OSError:
+                pass  # 日志写入失败不影响页面
+
+    def summary(self):
+        """{页面: {"n": 次数, "p50": 毫秒, "p95": 毫秒}}（本进程最近的重跑）"""
+        with self._lock:
+            recent = {page: list(values) for page, values in self._recent.items()}
+        return {page: _stats(values) for page, values in recent.items()}
+
+
+def _stats(values):
+    return {"n": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95)}
+
+
+def summarize(paths):
+    """统计日志文件中各页面的重跑耗时和各 span 的耗时分布"""
+    pages = defaultdict(list)
+    spans = defaultdict(list)
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                pages[record.get("page")].append(record["total_ms"])
+                for name, (ms, _) in record.get("spans", {}).items():
+                    spans[name].append(ms)
+    return (
+        {page: _stats(values) for page, values in pages.items()},
+        {name: _stats(values) for name, values in spans.items()},
+    )
+
+
+def _print_table(title, stats):
+    print(f"\n{title}")
+    print(f"  {'':<28} {'n':>7} {'p50 ms':>10} {'p95 ms':>10}")
+    for name, s in sorted(stats.items(), key=lambda kv: -(kv[1]["p95"] or 0)):
+        print(f"  {str(name):<28} {s['n']:>7} {s['p50']:>10.1f} {s['p95']:>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("用法: python perf.py <perf.log> [更多日志文件...]")
+        sys.exit(2)
+    page_stats, span_stats = summarize(sys.argv[1:])
+    _print_table("各页面重跑耗时", page_stats)
+    _print_table("各 span 耗时", span_stats)
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+学习进度存储 - 快照 + 追加日志
+
+- 掌握度变化以一行 JSON 追加到日志文件，单次写入成本与词汇量无关
+- 加载时在快照 (progress.json) 上按顺序重放日志
+- 日志超过阈值后轮转，并在后台线程中压缩进快照
+- ProgressWriter 在后台线程中批量落盘，点击处理中不再等待磁盘
+- 带评分的记录同时更新间隔重复状态 (schedule)，重放时按记录时间重新计算
+- stats 保存按掌握程度/分类/日期的汇总计数，每条记录 O(1) 更新，首页无需扫描
+- 每个用户一个目录；追加、轮转、压缩都持有文件锁，多个进程可以同时写同一用户的进度，
+  follow() 把其他进程追加的记录合并进内存，只合并增量，不整体覆盖
+- 目录在第一次写入时才创建；锁文件和日志只在每次读写时打开，实例不长期占用文件句柄
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows：只有进程内互斥，单进程本地运行足够
+    fcntl = None
+
+from scheduler import review
+
+MASTERY_MIN = 0
+MASTERY_MAX = 100
+MASTERED_THRESHOLD = 80
+# 汇总计数的结构版本，变化时按掌握度数据重建一次
+STATS_VERSION = 1
+
+
+def default_progress():
+    """空进度（汇总计数为空，与空的掌握度一致，无需重建）"""
+    return {
+        "mastery": {}, "schedule": {}, "favorites": [], "quiz_history": [], "streak": 0, "last_study": None,
+        "stats": new_stats(),
+    }
+
+
+def apply_mastery(mastery, item_id, delta):
+    """在掌握度字典上应用一次变化（限制在 0-100），返回新值"""
+    value = max(MASTERY_MIN, min(MASTERY_MAX, mastery.get(item_id, 0) + delta))
+    mastery[item_id] = value
+    return value
+
+
+def mastery_bucket(value):
+    """掌握度所属的档位：mastered 已掌握 / learning 学习中 / None 未学习"""
+    if value >= MASTERED_THRESHOLD:
+        return "mastered"
+    return "learning" if value > 0 else None
+
+
+def new_stats():
+    return {"version": STATS_VERSION, "buckets": {"mastered": 0, "learning": 0}, "categories": {}, "days": {}}
+
+
+def _bump(counts, bucket, n):
+    if bucket is not None:
+        counts[bucket] = counts.get(bucket, 0) + n
+
+
+def ensure_stats(progress, category_of):
+    """汇总计数缺失或版本不一致时按掌握度重建（category_of: id → 分类），返回是否重建"""
+    stats = progress.get("stats")
+    if stats is not None and stats.get("version") == STATS_VERSION:
+        return False
+    rebuilt = new_stats()
+    if stats is not None:
+        rebuilt["days"] = stats.get("days", {})  # 每日记录无法从掌握度还原，原样保留
+    for item_id, value in progress.get("mastery", {}).items():
+        bucket = mastery_bucket(value)
+        _bump(rebuilt["buckets"], bucket, 1)
+        category = category_of(item_id)
+        if category is not None and bucket is not None:
+            _bump(rebuilt["categories"].setdefault(category, {}), bucket, 1)
+    progress["stats"] = rebuilt
+    return True
+
+
+def _update_stats(stats, old, new, category, ts):
+    before, after = mastery_bucket(old), mastery_bucket(new)
+    if before != after:
+        _bump(stats["buckets"], before, -1)
+        _bump(stats["buckets"], after, 1)
+        if category is not None:
+            counts = stats["categories"].setdefault(category, {})
+            _bump(counts, before, -1)
+            _bump(counts, after, 1)
+    day = date.fromtimestamp(ts).isoformat()
+    stats["days"][day] = stats["days"].get(day, 0) + 1
+
+
+def apply_record(progress, item_id, delta, grade, ts, category=None):
+    """应用一条学习记录：更新掌握度和汇总计数；有评分时同时更新复习计划，返回新的计划（否则 None）"""
+    mastery = progress.setdefault("mastery", {})
+    old = mastery.get(item_id, 0)
+    new = apply_mastery(mastery, item_id, delta)
+    stats = progress.get("stats")
+    if stats is not None and stats.get("version") == STATS_VERSION:
+        _update_stats(stats, old, new, category, ts)
+    if grade is None:
+        return None
+    schedule = progress.setdefault("schedule", {})
+    card = schedule[item_id] = review(schedule.get(item_id), grade, ts)
+    return card
+
+
+class ProgressStore:
+    """快照 + 追加日志的进度存储（一个用户一个目录）
+
+    文件布局:
+    - progress.json          快照，_compacted_gen 记录已合并到第几代日志
+    - progress.journal       当前日志（追加写入）
+    - progress.journal.<N>   已轮转、等待压缩的第 N 代日志
+    - progress.lock          文件锁：追加、轮转、压缩互斥（跨进程）
+    - progress.json.corrupt.<时间戳>  无法解析的快照改名保留在这里，进度从默认值开始
+
+    每个实例有一个 origin，写入的记录带上它；follow() 只合并其他实例写入的记录。
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_bytes=256 * 1024):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else self.snapshot_path.with_suffix(".journal")
+        self.lock_path = self.snapshot_path.with_suffix(".lock")
+        self.compact_bytes = compact_bytes
+        self.origin = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._tail = None  # (日志文件 inode, 已读到的偏移)
+        self._snapshot_seen = None  # load() 时快照文件的标识，变化说明日志已被压缩
+        self._compactor = None
+
+    @contextmanager
+    def _locked(self):
+        """进程内互斥 + 跨进程文件锁（锁文件每次打开，关闭时释放；目录不存在时创建）"""
+        with self._lock:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    # ---------- 读取 ----------
+    def load(self):
+        """读取快照并重放尚未压缩的日志，同时记下日志的读取位置供 follow() 使用"""
+        if not self.snapshot_path.parent.exists():
+            # 还没有写过进度：不加锁，也不创建目录
+            self._tail = (None, 0)
+            self._snapshot_seen = None
+            return default_progress()
+        try:
+            with self._locked():
+                progress = self._read_snapshot()
+                compacted_gen = progress.pop("_compacted_gen", 0)
+                for gen, path in self._rotated_journals():
+                    if gen > compacted_gen:
+                        self._replay(path, progress)
+                self._tail = self._replay(self.journal_path, progress) or (None, 0)
+                self._snapshot_seen = self._snapshot_id()
+            return progress
+        except Exception:
+            return default_progress()
+
+    def follow(self, progress):
+        """合并其他进程在 load() 之后追加的记录，返回受影响的条目 id 列表
+
+        日志已被压缩、无法接着读时返回 None，调用方应重新 load()。
+        """
+        if self._tail is None:
+            return None
+        ino, offset = self._tail
+        try:
+            live = os.stat(self.journal_path)
+            if live.st_ino == ino and live.st_size == offset and self._snapshot_id() == self._snapshot_seen:
+                return []  # 没有新记录：绝大多数重跑只需两次 stat，不加锁
+        except FileNotFoundError:
+            if ino is None and self._snapshot_id() == self._snapshot_seen:
+                return []  # load() 时没有日志，现在也没有
+        changed = []
+        with self._locked():
+            # 轮转和压缩在同一次持锁中完成，快照变了说明读到一半的日志已被合并删除
+            # （新日志可能复用旧日志的 inode，所以不能只比较 inode）
+            if self._snapshot_id() != self._snapshot_seen:
+                return None
+            if ino is not None and not self._same_path(self.journal_path, ino):
+                return None
+            self._tail = self._replay(self.journal_path, progress, offset, changed) or self._tail
+        return changed
+
+    def _snapshot_id(self):
+        try:
+            st = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_snapshot(self):
+        """读取快照（调用方需持有锁）；快照损坏时改名保留，从默认进度开始，已轮转的日志照常重放"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+        except FileNotFoundError:
+            return default_progress()
+        except ValueError:
+            progress = None  # 旧版非原子写入可能留下不完整的文件
+        if isinstance(progress, dict):
+            return progress
+        corrupt_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.corrupt.{int(time.time())}")
+        os.replace(self.snapshot_path, corrupt_path)
+        return default_progress()
+
+    def _replay(self, path, progress, offset=0, changed=None):
+        """从 offset 开始重放日志；changed 不为 None 时只重放其他实例的记录并收集其 id
+
+        返回 (inode, 读到的偏移)，文件不存在时返回 None。
+        """
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 另一个进程正在写的行，下次再读
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # 进程崩溃时最后一行可能不完整，跳过即可
+                    continue
+                if changed is not None:
+                    if record.get("o") == self.origin:
+                        continue
+                    changed.append(record["id"])
+                apply_record(
+                    progress, record["id"], record["d"], record.get("q"), record.get("ts", 0), record.get("c")
+                )
+            return os.fstat(f.fileno()).st_ino, offset
+
+    def _rotated_journals(self):
+        """已轮转的日志 [(代数, 路径)]，按代数升序"""
+        rotated = []
+        for path in self.journal_path.parent.glob(self.journal_path.name + ".*"):
+            suffix = path.name[len(self.journal_path.name) + 1:]
+            if suffix.isdigit():
+                rotated.append((int(suffix), path))
+        return sorted(rotated)
+
+    # ---------- 写入 ----------
+    def record(self, item_id, delta, source, ts=None, grade=None, category=None):
+        """追加一条学习记录：条目 id、掌握度变化量、时间戳、来源 (flashcard/quiz/home)、评分、分类"""
+        self.record_many([(item_id, delta, ts if ts is not None else time.time(), source, grade, category)])
+
+    def record_many(self, records, fsync=False):
+        """批量追加 [(id, delta, ts, source, grade, category)]，一次写入"""
+        lines = "".join(
+            json.dumps(self._record_json(*record), ensure_ascii=False) + "\n"
+            for record in records
+        )
+        if not lines:
+            return
+        with self._locked():
+            # 每次重新打开：其他进程可能已轮转日志，也不长期占用文件句柄
+            with open(self.journal_path, 'a', encoding='utf-8') as journal:
+                journal.write(lines)
+                journal.flush()
+                if fsync:
+                    os.fsync(journal.fileno())
+                size = journal.tell()
+        if size >= self.compact_bytes:
+            self.compact_async()
+
+    def _record_json(self, item_id, delta, ts, source, grade=None, category=None):
+        record = {"id": item_id, "d": delta, "ts": round(ts, 3), "src": source, "o": self.origin}
+        if grade is not None:
+            record["q"] = grade
+        if category is not None:
+            record["c"] = category
+        return record
+
+    @staticmethod
+    def _same_path(path, ino):
+        try:
+            return os.stat(path).st_ino == ino
+        except FileNotFoundError:
+            return False
+
+    def save(self, progress):
+        """以给定进度为准整体写入快照，并丢弃之前的所有日志（会覆盖其他进程的记录，仅用于重置）"""
+        with self._compact_lock, self._locked():
+            gen = self._rotate_locked()
+            self._write_snapshot(progress, gen)
+            for rotated_gen, path in self._rotated_journals():
+                if rotated_gen <= gen:
+                    path.unlink()
+
+    # ---------- 压缩 ----------
+    def compact_async(self):
+        """在后台线程中把当前日志合并进快照"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name="progress-compactor", daemon=True)
+            self._compactor.start()
+
+    def compact(self, migrate=None):
+        """轮转当前日志并把所有已轮转的日志合并进快照
+
+        migrate(progress) 在写入快照前调用，用于结构升级（如重建汇总计数）。
+        整个过程持有文件锁，合并基于磁盘上的最新数据，不会覆盖其他进程的记录。
+        """
+        with self._compact_lock, self._locked():
+            self._rotate_locked()
+            self._compact_locked(migrate)
+
+    def _compact_locked(self, migrate=None):
+        rotated = self._rotated_journals()
+        if not rotated and migrate is None:
+            return
+        progress = self._read_snapshot()
+        compacted_gen = progress.pop("_compacted_gen", 0)
+        for gen, path in rotated:
+            if gen > compacted_gen:
+                self._replay(path, progress)
+        if migrate is not None:
+            migrate(progress)
+        last_gen = rotated[-1][0] if rotated else compacted_gen
+        # 先写快照再删日志；若中途崩溃，_compacted_gen 保证日志不会被重复重放
+        self._write_snapshot(progress, last_gen)
+        for gen, path in rotated:
+            path.unlink()
+
+    def _rotate_locked(self):
+        """把当前日志重命名为新一代（调用方需持有锁），返回该代数
+
+        代数每次都从磁盘重新计算，多个进程轮转同一分片时也保持递增。
+        """
+        gen = max([g for g, _ in self._rotated_journals()] + [self._snapshot_gen()]) + 1
+        if self.journal_path.exists():
+            os.replace(self.journal_path, self.journal_path.with_name(f"{self.journal_path.name}.{gen}"))
+        return gen
+
+    def _snapshot_gen(self):
+        try:
+            return self._read_snapshot().get("_compacted_gen", 0)
+        except Exception:
+            return 0
+
+    def _write_snapshot(self, progress, gen):
+        data = dict(progress)
+        data["_compacted_gen"] = gen
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.snapshot_path)
+
+
+class ProgressWriter:
+    """后台进度写入线程（一个进程一个，服务所有用户的进度存储）
+
+    点击处理只把变化放入内存队列；写入线程在第一条变化到达后等待 interval 秒，
+    把这段时间内的所有变化按存储分组，每个存储一次写入 + fsync。进程退出时自动落盘。
+    """
+
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._pending = []  # [(store, record)]，按提交顺序
+        self._flush_now = False
+        self._closed = False
+        self._writing = False
+        self._errors = []
+        self._thread = threading.Thread(target=self._run, name="progress-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------- 提交 ----------
+    def submit_record(self, store, item_id, delta, source, grade=None, ts=None, category=None):
+        record = (item_id, delta, ts if ts is not None else time.time(), source, grade, category)
+        with self._cond:
+            self._pending.append((store, record))
+            self._cond.notify()
+
+    def flush(self, wait=True, timeout=10):
+        """立即落盘；wait=True 时阻塞直到队列写完"""
+        with self._cond:
+            # 队列为空时不置位：否则标志一直保留，下一条记录会跳过合并窗口立即写入
+            if self._pending:
+                self._flush_now = True
+                self._cond.notify_all()
+            if wait:
+                self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self):
+        """停止写入线程，退出前写完所有待写内容"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def pop_errors(self):
+        with self._cond:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def session_token(self):
+        """返回一个放进会话状态的对象；会话结束、对象被回收时触发一次落盘"""
+        token = _SessionToken()
+        weakref.finalize(token, self.flush, False)
+        return token
+
+    # ---------- 写入线程 ----------
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending and self._closed:
+                    return
+                # 合并窗口：等待 interval 秒，期间的变化一起写入
+                deadline = time.monotonic() + self.interval
+                while not (self._flush_now or self._closed):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch, self._pending = self._pending, []
+                self._flush_now = False
+                self._writing = True
+            try:
+                by_store = {}
+                for store, record in batch:
+                    by_store.setdefault(store, []).append(record)
+                for store, records in by_store.items():
+                    try:
+                        store.record_many(records, fsync=True)
+                    except Exception as e:
+                        with self._cond:
+                            self._errors.append(e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+
+class _SessionToken:
+    """会话结束标记（仅用于弱引用回收回调）"""
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+词条排序 - 按领域相关度给文档中提取的单词打分
+
+- 关键性：单词在文档中的频率与通用英语背景频率比较，用对数似然比（Dunning G²）衡量
+  "在这份文档里比平时常见多少"；封面、版权、目录等通用词背景频率高，得分低
+- 背景频率来自 data/background_words.txt（按常见程度排序的词表），按齐普夫定律由排名估计
+- 领域加权：单词所在的行（Word 文档中为段落）中含有内置词库词条的比例越高，得分越高，最多加倍；
+  比例由提取时统计的文档开头样本估计
+- 取前 N 个时用堆在一遍扫描中选出，不对全部候选排序
+
+本模块不依赖 Streamlit。
+"""
+
+import heapq
+import math
+import threading
+from pathlib import Path
+
+from lemma import canonical_key, prefer_surface
+
+BACKGROUND_WORDS_FILE = Path(__file__).resolve().parent / "data" / "background_words.txt"
+ZIPF_TOP_PER_MILLION = 60000.0  # 排名第 1 的词每百万词出现的次数，第 r 名约为它的 1/r
+UNSEEN_PER_MILLION = 1.0        # 不在背景词表中的词按较少见的词估计
+BACKGROUND_TOKENS = 100_000_000  # 背景语料的规模（词数）
+COOC_BOOST = 1.0                # 所在的行都含有内置词库词条时得分乘以 1 + COOC_BOOST
+
+
+def load_background(path=BACKGROUND_WORDS_FILE):
+    """读取背景词表，返回 {小写词: 每百万词出现次数}"""
+    frequencies = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            word = line.strip().lower()
+            if not word or word.startswith('#') or word in frequencies:
+                continue
+            frequencies[word] = ZIPF_TOP_PER_MILLION / (len(frequencies) + 1)
+    return frequencies
+
+
+_lock = threading.Lock()
+_background = None
+
+
+def background_frequencies():
+    """进程内共享的背景词频（第一次调用时读取）"""
+    global _background
+    if _background is None:
+        with _lock:
+            if _background is None:
+                _background = load_background()
+    return _background
+
+
+def log_likelihood(a, c, b, d):
+    """对数似然比 G²：词在文档中出现 a 次（共 c 词），在背景中出现 b 次（共 d 词）
+
+    文档中的相对频率低于背景时返回负值，排序时排在所有高于背景的词之后。
+    """
+    expected = (a + b) / (c + d)
+    g2 = 0.0
+    if a:
+        g2 += a * math.log(a / (c * expected))
+    if b:
+        g2 += b * math.log(b / (d * expected))
+    g2 *= 2
+    return g2 if a * d >= b * c else -g2
+
+
+def keyness(count, tokens, per_million, lines=0, cooc=0):
+    """一个单词的相关度得分：关键性 × 领域加权（lines 行中有 cooc 行含有内置词库词条）"""
+    background = per_million * BACKGROUND_TOKENS / 1_000_000
+    score = log_likelihood(count, max(tokens, count), background, BACKGROUND_TOKENS)
+    if score > 0 and cooc:
+        score *= 1 + COOC_BOOST * min(1.0, cooc / lines)
+    return score
+
+
+def merge_term_stats(results):
+    """合并多个文件的单词统计（按规范键），返回 ({规范键: [写法, 次数, 行数, 同行数]}, 总词数)
+
+    写法的选择和顺序与 merge_extractions 的单词一致。
+    """
+    stats = {}
+    tokens = 0
+    for result in results:
+        tokens += result.get("tokens", 0)
+        words = result.get("words", [])
+        counts = result.get("counts") or [1] * len(words)
+        lines = result.get("lines") or [0] * len(words)
+        cooc = result.get("cooc") or [0] * len(words)
+        for word, count, in_lines, together in zip(words, counts, lines, cooc):
+            key = canonical_key(word)
+            entry = stats.get(key)
+            if entry is None:
+                stats[key] = [word, count, in_lines, together]
+            else:
+                entry[0] = prefer_surface(entry[0], word)
+                entry[1] += count
+                entry[2] += in_lines
+                entry[3] += together
+    return stats, tokens
+
+
+def rank_terms(results, limit=None, exclude=(), background=None):
+    """按相关度从高到低返回单词，得分相同时按文档顺序
+
+    exclude 中的规范键（如词库中已有的单词）不参与排序，不占名额；
+    limit 为 None 或不小于候选总数时返回全部候选。
+    """
+    stats, tokens = merge_term_stats(results)
+    if background is None:
+        background = background_frequencies()
+    get = background.get
+    candidates = [(order, entry) for order, (key, entry) in enumerate(stats.items()) if key not in exclude]
+    scored = (
+        (keyness(count, tokens, get(surface.lower(), UNSEEN_PER_MILLION), lines, cooc), -order, surface)
+        for order, (surface, count, lines, cooc) in candidates
+    )
+    if limit is None or limit >= len(candidates):
+        top = sorted(scored, reverse=True)
+    else:
+        top = heapq.nlargest(limit, scored)
+    return [surface for _, _, surface in top]
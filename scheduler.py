@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+间隔重复调度 - SM-2
+
+- 每个条目保存复习次数、间隔（天）、难度系数和下次复习时间
+- 回答越顺利间隔增长越快，答错的条目在短时间内重新出现
+- DueQueue 用小根堆维护到期时间，取"最先到期的 k 个"为 O(k log n)
+"""
+
+import heapq
+
+DAY_SECONDS = 24 * 60 * 60
+# 答错后多久重新复习（秒），保证在同一轮练习中还能再见到
+RELEARN_SECONDS = 10 * 60
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# 评分（SM-2 的 0-5 分制）
+GRADE_AGAIN = 1   # 不认识 / 答错
+GRADE_HARD = 3    # 勉强答对（难度系数下降）
+GRADE_GOOD = 4    # 认识 / 选择题答对（难度系数不变）
+GRADE_EASY = 5
+
+
+def review(card, grade, now):
+    """按 SM-2 计算一次复习后的新状态，card 为 None 表示第一次复习
+
+    状态字典: n 连续答对次数, i 间隔（天）, e 难度系数, due 下次复习时间戳
+    返回新的字典，不修改传入的 card。
+    """
+    reps = card["n"] if card else 0
+    interval = card["i"] if card else 0
+    ease = card["e"] if card else INITIAL_EASE
+    if grade < 3:
+        reps = 0
+        interval = 0
+        due = now + RELEARN_SECONDS
+    else:
+        if reps == 0:
+            interval = 1
+        elif reps == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        reps += 1
+        due = now + interval * DAY_SECONDS
+    ease = max(MIN_EASE, ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    return {"n": reps, "i": interval, "e": round(ease, 3), "due": round(due, 3)}
+
+
+class DueQueue:
+    """到期队列
+
+    堆中的旧记录不立即删除（惰性失效）：更新时直接压入新记录，
+    取出时与 _due 中的当前值比对，不一致的丢弃。
+    """
+
+    def __init__(self, schedule=None):
+        self._due = {item_id: card["due"] for item_id, card in (schedule or {}).items()}
+        self._heap = [(due, item_id) for item_id, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._due)
+
+    def __contains__(self, item_id):
+        return item_id in self._due
+
+    def update(self, item_id, due):
+        self._due[item_id] = due
+        heapq.heappush(self._heap, (due, item_id))
+        # 失效记录过多时重建，堆的大小保持在有效条目数的常数倍
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._heap = [(d, i) for i, d in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, item_id):
+        self._due.pop(item_id, None)
+
+    def peek(self, k, now=None, exclude=(), exists=None):
+        """最先到期的至多 k 个条目 id（不出队）
+
+        now 不为 None 时只返回已到期的；exists(id) 为假的条目（如已删除的词汇）被跳过。
+        """
+        heap = self._heap
+        taken = []
+        result = []
+        while heap and len(result) < k:
+            due, item_id = heapq.heappop(heap)
+            if self._due.get(item_id) != due:
+                continue  # 失效记录，直接丢弃
+            taken.append((due, item_id))
+            if now is not None and due > now:
+                break
+            if item_id in exclude or (exists is not None and not exists(item_id)):
+                continue
+            result.append(item_id)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return result
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自定义词库存储 - SQLite
+
+词汇和短语分别存放在带索引的表中：
+- 支持增量插入、更新、删除，不再整文件重写
+- 所有写操作都在事务中完成，中途崩溃不会损坏已有数据
+- 首次打开时自动从旧版 custom_vocabulary.json 迁移一次
+- id 由持久化的递增序号分配，清空数据后也不会复用
+- terms 表维护 词条键 → id 的去重索引，随增删改增量更新；词汇的键是 lemma.canonical_key
+  （flash/flashes/flashing 相同），短语的键是小写原文
+- 跳过已存在的词汇时，新写法并入已有条目的 aliases（别名）；导入时已有单词的变形由
+  add_vocabulary_aliases 直接并入
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from lemma import canonical_key, merge_aliases, split_aliases
+
+VOCAB_FIELDS = ("id", "english", "chinese", "phonetic", "example", "category", "aliases")
+PHRASE_FIELDS = ("id", "english", "chinese", "scenario")
+ID_PREFIXES = {"vocabulary": "custom_v", "phrases": "custom_p"}
+# 词条键的计算规则变化时递增，打开数据库时重新计算 term 列并重建 terms 表
+TERMS_INDEX_VERSION = "3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vocabulary (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    english TEXT NOT NULL,
+    chinese TEXT NOT NULL DEFAULT '',
+    phonetic TEXT NOT NULL DEFAULT '',
+    example TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT '',
+    aliases TEXT NOT NULL DEFAULT '',
+    term TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_vocabulary_english ON vocabulary (english COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_vocabulary_category ON vocabulary (category);
+CREATE TABLE IF NOT EXISTS phrases (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    english TEXT NOT NULL,
+    chinese TEXT NOT NULL DEFAULT '',
+    scenario TEXT NOT NULL DEFAULT '',
+    term TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_phrases_english ON phrases (english COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_phrases_scenario ON phrases (scenario);
+CREATE TABLE IF NOT EXISTS terms (
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (kind, term)
+);
+CREATE INDEX IF NOT EXISTS idx_terms_id ON terms (kind, id);
+"""
+# 旧版数据库缺少的列：(表, 列, 定义)；列补齐后再建依赖它的索引
+ADDED_COLUMNS = (
+    ("vocabulary", "aliases", "TEXT NOT NULL DEFAULT ''"),
+    ("vocabulary", "term", "TEXT NOT NULL DEFAULT ''"),
+    ("phrases", "term", "TEXT NOT NULL DEFAULT ''"),
+)
+TERM_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_vocabulary_term ON vocabulary (term);
+CREATE INDEX IF NOT EXISTS idx_phrases_term ON phrases (term);
+"""
+
+
+def term_key(table, english):
+    """去重索引中的词条键：词汇为规范键，短语为小写原文"""
+    return canonical_key(english) if table == "vocabulary" else english.lower()
+
+
+class CustomStore:
+    """自定义词汇/短语的 SQLite 存储（线程安全，可在多个会话间共享）"""
+
+    def __init__(self, db_path, legacy_json=None):
+        self.db_path = Path(db_path)
+        self._lock = threading.RLock()
+        self._depth = 0
+        # isolation_level=None: 由本类显式控制事务边界
+        self._conn = sqlite3.connect(
+            str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._add_columns()
+        self.migration_warning = None  # 旧版 JSON 无法读取时的说明，由调用方提示用户
+        if legacy_json is not None:
+            self.migrate_from_json(legacy_json)
+        self._build_terms()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- 事务 ----------
+    @contextmanager
+    def transaction(self):
+        """写事务：可嵌套，最外层提交时递增 revision"""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self._conn
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self._conn
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('revision', '1') "
+                    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._depth = 0
+
+    def revision(self):
+        """数据版本号，每次写事务提交后加一（跨进程可见）"""
+        return int(self.get_meta("revision", 0))
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.transaction() as conn:
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, str(value)),
+            )
+
+    # ---------- 读取 ----------
+    def load_all(self):
+        """按插入顺序读取全部自定义数据"""
+        with self._lock:
+            vocab = self._conn.execute(
+                f"SELECT {', '.join(VOCAB_FIELDS)} FROM vocabulary ORDER BY seq"
+            ).fetchall()
+            phrases = self._conn.execute(
+                f"SELECT {', '.join(PHRASE_FIELDS)} FROM phrases ORDER BY seq"
+            ).fetchall()
+        return {
+            "vocabulary": [dict(row) for row in vocab],
+            "phrases": [dict(row) for row in phrases],
+        }
+
+    def count(self, table):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self._table(table)}").fetchone()[0]
+
+    def lookup_terms(self, table, terms):
+        """在去重索引中查找词条，返回 {词条键: id}（键见 term_key）"""
+        kind = self._table(table)
+        found = {}
+        terms = list({term_key(kind, t) for t in terms})
+        with self._lock:
+            # 分批查询，避免超过 SQLite 的参数个数上限
+            for i in range(0, len(terms), 500):
+                batch = terms[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT term, id FROM terms WHERE kind = ? AND term IN ({', '.join('?' for _ in batch)})",
+                    (kind, *batch),
+                ).fetchall()
+                found.update((row[0], row[1]) for row in rows)
+        return found
+
+    # ---------- 写入 ----------
+    def add_vocabulary(self, items, skip_existing=False):
+        """批量插入词汇（单个事务），返回实际插入数
+
+        - 没有 id 的条目自动分配新 id（写回条目字典）
+        - id 已存在的条目会被忽略；skip_existing=True 时规范键已存在的也会被忽略，
+          其写法和别名并入已有条目（或同一批中靠前的条目）的 aliases
+        """
+        return self._insert("vocabulary", VOCAB_FIELDS, items, skip_existing)
+
+    def add_phrases(self, items, skip_existing=False):
+        """批量插入短语（单个事务），返回实际插入数，规则同 add_vocabulary"""
+        return self._insert("phrases", PHRASE_FIELDS, items, skip_existing)
+
+    def add_vocabulary_aliases(self, forms_by_id):
+        """把其他写法并入已有词汇的别名：{id: [写法]}（单个事务），返回别名有变化的条目数"""
+        if not forms_by_id:
+            return 0
+        with self.transaction() as conn:
+            updates = self.alias_updates(forms_by_id)
+            conn.executemany("UPDATE vocabulary SET aliases = ? WHERE id = ?", [(a, i) for i, a in updates.items()])
+        return len(updates)
+
+    def alias_updates(self, forms_by_id):
+        """并入 {id: [写法]} 后别名会变化的词汇：{id: 新别名}（只读，可用于试运行）
+
+        不存在的 id（如内置词库的条目）忽略；与原文或已有别名只差大小写的写法不重复添加。
+        """
+        ids = list(forms_by_id)
+        updates = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, english, aliases FROM vocabulary WHERE id IN ({', '.join('?' for _ in batch)})", batch
+                ).fetchall()
+                for item_id, english, aliases in rows:
+                    merged = merge_aliases(english, aliases, forms_by_id[item_id])
+                    if merged != aliases:
+                        updates[item_id] = merged
+        return updates
+
+    def allocate_ids(self, table, n):
+        """分配 n 个新 id；序号只增不减，清空或删除后也不会复用"""
+        table = self._table(table)
+        if n <= 0:
+            return []
+        with self.transaction() as conn:
+            seq = self._sequence(conn, table)
+            conn.execute("UPDATE meta SET value = ? WHERE key = ?", (str(seq + n), f"{table}_seq"))
+        return [f"{ID_PREFIXES[table]}{seq + i}" for i in range(1, n + 1)]
+
+    def update_vocabulary(self, item_id, **fields):
+        return self._update("vocabulary", VOCAB_FIELDS, item_id, fields)
+
+    def update_phrase(self, item_id, **fields):
+        return self._update("phrases", PHRASE_FIELDS, item_id, fields)
+
+    def delete_vocabulary(self, ids):
+        return self._delete("vocabulary", ids)
+
+    def delete_phrases(self, ids):
+        return self._delete("phrases", ids)
+
+    def clear(self):
+        """清空所有自定义词汇和短语（id 序号保留，之后分配的 id 不会与旧 id 重复）"""
+        with self.transaction() as conn:
+            # 先记下现有最大序号，否则表清空后将无从得知旧 id 用到了哪里
+            for table in ("vocabulary", "phrases"):
+                self._sequence(conn, table)
+            conn.execute("DELETE FROM vocabulary")
+            conn.execute("DELETE FROM phrases")
+            conn.execute("DELETE FROM terms")
+
+    def _insert(self, table, fields, items, skip_existing=False):
+        items = list(items)
+        if not items:
+            return 0
+        with self.transaction() as conn:
+            keyed = [(term_key(table, item["english"]), item) for item in items]
+            if skip_existing:
+                existing = self.lookup_terms(table, [item["english"] for item in items])
+                kept = {}
+                for term, item in keyed:
+                    first = kept.get(term)
+                    if first is None and term not in existing:
+                        kept[term] = item
+                    elif table == "vocabulary":
+                        forms = [item["english"], *split_aliases(item.get("aliases"))]
+                        if first is None:
+                            self._add_aliases(conn, existing[term], forms)
+                        elif len(forms) > 1 or forms[0].lower() != first["english"].lower():
+                            first["aliases"] = merge_aliases(first["english"], first.get("aliases"), forms)
+                keyed = list(kept.items())
+            items = [item for _, item in keyed]
+            self._reserve_ids(conn, table, [item["id"] for item in items if item.get("id")])
+            missing = [item for item in items if not item.get("id")]
+            for item, item_id in zip(missing, self.allocate_ids(table, len(missing))):
+                item["id"] = item_id
+            # id 已存在（或在同一批中重复）的条目忽略，其余一次 executemany 写入
+            taken = self._existing_ids(conn, table, [item["id"] for item in items])
+            fresh = []
+            for term, item in keyed:
+                if item["id"] not in taken:
+                    taken.add(item["id"])
+                    fresh.append((term, item))
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(fields)}, term) VALUES ({', '.join('?' for _ in fields)}, ?)",
+                [(*(item.get(f, "") or "" for f in fields), term) for term, item in fresh],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO terms (kind, term, id) VALUES (?, ?, ?)",
+                [(table, term, item["id"]) for term, item in fresh],
+            )
+            return len(fresh)
+
+    def _update(self, table, fields, item_id, values):
+        values = {k: v for k, v in values.items() if k in fields and k != "id"}
+        if not values:
+            return 0
+        if "english" in values:
+            values["term"] = term_key(table, values["english"])
+        assignments = ", ".join(f"{k} = ?" for k in values)
+        with self.transaction() as conn:
+            old = conn.execute(f"SELECT term FROM {table} WHERE id = ?", (item_id,)).fetchone()
+            cur = conn.execute(
+                f"UPDATE {table} SET {assignments} WHERE id = ?",
+                (*values.values(), item_id),
+            )
+            if old is not None and "english" in values:
+                conn.execute("DELETE FROM terms WHERE kind = ? AND id = ?", (table, item_id))
+                self._reindex_terms(conn, table, {old[0], values["term"]})
+            return cur.rowcount
+
+    def _delete(self, table, ids):
+        ids = list(ids)
+        if not ids:
+            return 0
+        with self.transaction() as conn:
+            removed_terms = set()
+            deleted = 0
+            for item_id in ids:
+                row = conn.execute(f"SELECT term FROM {table} WHERE id = ?", (item_id,)).fetchone()
+                if row is None:
+                    continue
+                conn.execute(f"DELETE FROM {table} WHERE id = ?", (item_id,))
+                conn.execute("DELETE FROM terms WHERE kind = ? AND id = ?", (table, item_id))
+                removed_terms.add(row[0])
+                deleted += 1
+            self._reindex_terms(conn, table, removed_terms)
+            return deleted
+
+    # ---------- 去重索引 ----------
+    def _reindex_terms(self, conn, table, terms):
+        """为失去映射的词条键重新指向最早插入的同键条目（允许重复词条存在时使用）"""
+        for term in terms:
+            if conn.execute("SELECT 1 FROM terms WHERE kind = ? AND term = ?", (table, term)).fetchone():
+                continue
+            row = conn.execute(f"SELECT id FROM {table} WHERE term = ? ORDER BY seq LIMIT 1", (term,)).fetchone()
+            if row is not None:
+                conn.execute("INSERT INTO terms (kind, term, id) VALUES (?, ?, ?)", (table, term, row[0]))
+
+    def _add_aliases(self, conn, item_id, forms):
+        row = conn.execute("SELECT english, aliases FROM vocabulary WHERE id = ?", (item_id,)).fetchone()
+        if row is None:
+            return
+        aliases = merge_aliases(row[0], row[1], forms)
+        if aliases != row[1]:
+            conn.execute("UPDATE vocabulary SET aliases = ? WHERE id = ?", (aliases, item_id))
+
+    def _add_columns(self):
+        """给旧版数据库补上新增的列（已有数据的 term 列由 _build_terms 填写）"""
+        with self._lock:
+            for table, column, definition in ADDED_COLUMNS:
+                columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            self._conn.executescript(TERM_INDEXES)
+
+    def _build_terms(self):
+        """旧版数据库的 term 列和 terms 表按当前规则计算：首次打开或规则变化后按插入顺序重建一次"""
+        if self.get_meta("terms_indexed") == TERMS_INDEX_VERSION:
+            return
+        with self.transaction() as conn:
+            for table in ("vocabulary", "phrases"):
+                rows = conn.execute(f"SELECT seq, id, english FROM {table} ORDER BY seq").fetchall()
+                keyed = [(term_key(table, row[2]), row[0], row[1]) for row in rows]
+                conn.executemany(f"UPDATE {table} SET term = ? WHERE seq = ?", [(t, seq) for t, seq, _ in keyed])
+                conn.execute("DELETE FROM terms WHERE kind = ?", (table,))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO terms (kind, term, id) VALUES (?, ?, ?)",
+                    [(table, t, item_id) for t, _, item_id in keyed],
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('terms_indexed', ?)", (TERMS_INDEX_VERSION,)
+            )
+
+    def _sequence(self, conn, table):
+        """已分配的最大序号；还没有记录时从现有最大 id 开始并写入 meta"""
+        key = f"{table}_seq"
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return int(row[0])
+        seq = self._max_id_number(conn, table)
+        conn.execute("INSERT INTO meta (key, value) VALUES (?, ?)", (key, str(seq)))
+        return seq
+
+    def _reserve_ids(self, conn, table, ids):
+        """写入带 id 的条目（如迁移）时推进序号，之后分配的 id 不会与其冲突"""
+        seq = self._sequence(conn, table)
+        prefix = ID_PREFIXES[table]
+        numbers = [int(i[len(prefix):]) for i in ids if i.startswith(prefix) and i[len(prefix):].isdigit()]
+        if numbers and max(numbers) > seq:
+            conn.execute("UPDATE meta SET value = ? WHERE key = ?", (str(max(numbers)), f"{table}_seq"))
+
+    @staticmethod
+    def _existing_ids(conn, table, ids):
+        """ids 中已存在于表中的 id 集合（分批查询）"""
+        found = set()
+        for i in range(0, len(ids), 500):
+            batch = ids[i:i + 500]
+            rows = conn.execute(
+                f"SELECT id FROM {table} WHERE id IN ({', '.join('?' for _ in batch)})", batch
+            ).fetchall()
+            found.update(row[0] for row in rows)
+        return found
+
+    @staticmethod
+    def _max_id_number(conn, table):
+        """现有 id 中最大的序号（首次分配时作为起点，兼容旧版按数量生成的 id）"""
+        prefix = ID_PREFIXES[table]
+        numbers = [0]
+        for (item_id,) in conn.execute(f"SELECT id FROM {table} WHERE id LIKE ?", (prefix + "%",)):
+            suffix = item_id[len(prefix):]
+            if suffix.isdigit():
+                numbers.append(int(suffix))
+        return max(numbers)
+
+    @staticmethod
+    def _table(name):
+        if name not in ("vocabulary", "phrases"):
+            raise ValueError(f"未知的数据表: {name}")
+        return name
+
+    # ---------- 迁移 ----------
+    def migrate_from_json(self, json_path):
+        """从旧版 JSON 文件一次性迁移数据，迁移后原文件重命名为 .bak 保留
+
+        文件损坏（无法解析或结构不对）时改名为 .corrupt 保留，不迁移任何数据，
+        说明写入 migration_warning；迁移同样标记为已完成，之后打开不再重试。
+        """
+        json_path = Path(json_path)
+        if self.get_meta("json_migrated"):
+            return 0
+        data = {}
+        suffix = ".bak"
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("顶层不是对象")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            data = {}
+            suffix = ".corrupt"
+            self.migration_warning = f"旧版自定义词库 {json_path} 无法读取（{e}），已改名为 {json_path.name}.corrupt，未迁移"
+        with self.transaction() as conn:
+            migrated = self.add_vocabulary(data.get("vocabulary", []))
+            migrated += self.add_phrases(data.get("phrases", []))
+            for table in ("vocabulary", "phrases"):
+                self._sequence(conn, table)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (str(json_path),),
+            )
+        try:
+            json_path.replace(json_path.with_name(json_path.name + suffix))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # 已标记为迁移完成，改名失败不影响使用，原文件留在原处
+            self.migration_warning = self.migration_warning or f"旧版自定义词库 {json_path} 改名失败: {e}"
+        return migrated
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""测试配置 - 把项目根目录加入 sys.path，测试直接导入各模块"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
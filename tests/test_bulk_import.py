@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""bulk_import 命令行批量导入测试"""
+
+import json
+
+from bulk_import import CUSTOM_DB_NAME, run_import
+from extractor import SENTENCE_LIMIT
+from lemma import split_aliases
+from storage import CustomStore
+
+
+def _import(data_dir, path, **options):
+    return run_import([str(path)], data_dir=data_dir, workers=1, log=lambda message: None, **options)
+
+
+def _vocabulary(data_dir):
+    store = CustomStore(data_dir / CUSTOM_DB_NAME)
+    try:
+        return {w["english"]: w for w in store.load_all()["vocabulary"]}
+    finally:
+        store.close()
+
+
+def test_variants_of_existing_words_are_stored_as_aliases(tmp_path):
+    data_dir = tmp_path / "data"
+    first = tmp_path / "first.txt"
+    first.write_text("Flash the watchdog image.\n", encoding="utf-8")
+    second = tmp_path / "second.txt"
+    second.write_text("The tool flashed both watchdogs; flashing takes a while. Rollbacks are rare.\n", encoding="utf-8")
+
+    _import(data_dir, first, sentences=False)
+    preview = _import(data_dir, second, sentences=False, dry_run=True)
+    assert preview["words_alias_pending"] == 2
+    summary = _import(data_dir, second, sentences=False)
+
+    assert summary["words_alias_merged"] == 2
+    vocabulary = _vocabulary(data_dir)
+    assert not {"flashed", "flashing", "watchdogs", "Rollbacks"} & set(vocabulary)
+    assert set(split_aliases(vocabulary["Flash"]["aliases"])) == {"flashed", "flashing"}
+    assert split_aliases(vocabulary["watchdog"]["aliases"]) == ["watchdogs"]
+
+    # 再次导入不会重复记录别名
+    again = _import(data_dir, second, sentences=False)
+    assert again["words_alias_merged"] == 0
+
+
+def _snapshot(directory):
+    return {path.relative_to(directory): path.read_bytes() for path in directory.rglob("*") if path.is_file()}
+
+
+def test_dry_run_leaves_data_dir_untouched(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "custom_vocabulary.json").write_text(json.dumps({
+        "vocabulary": [{"id": "custom_v1", "english": "flash", "chinese": "刷写"}], "phrases": [],
+    }), encoding="utf-8")
+    doc = tmp_path / "doc.txt"
+    doc.write_text("The watchdog flashed the image twice. Throttle the heartbeat.\n", encoding="utf-8")
+
+    before = _snapshot(data_dir)
+    preview = _import(data_dir, doc, dry_run=True)
+    assert _snapshot(data_dir) == before
+    assert preview["words_alias_pending"] == 1  # 在副本上完成了旧版 JSON 迁移
+    assert preview["words_new"] > 0
+
+    _import(data_dir, doc)
+    before = _snapshot(data_dir)
+    _import(data_dir, doc, dry_run=True)
+    assert _snapshot(data_dir) == before
+
+
+def test_summary_lists_files_with_truncated_sentences(tmp_path):
+    doc = tmp_path / "long.txt"
+    doc.write_text(" ".join(f"Step {i} flashes the gateway firmware." for i in range(SENTENCE_LIMIT + 1)), encoding="utf-8")
+    short = tmp_path / "short.txt"
+    short.write_text("Step one flashes the gateway firmware.", encoding="utf-8")
+
+    summary = run_import([str(doc), str(short)], data_dir=tmp_path / "data", workers=1,
+                         dry_run=True, words=False, log=lambda message: None)
+
+    assert summary["sentences_found"] == SENTENCE_LIMIT + 1
+    assert summary["sentences_truncated"] == [str(doc)]
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""corpus_index 搜索、分类索引和干扰项抽样测试"""
+
+import random
+
+from corpus_index import CategoryIndex, DistractorSampler, VocabularySearchIndex
+
+
+def _word(item_id, english, chinese="", aliases=""):
+    return {"id": item_id, "english": english, "chinese": chinese, "aliases": aliases}
+
+
+def _ids(words):
+    return [w["id"] for w in words]
+
+
+def test_search_ranks_exact_then_prefix_then_contains():
+    index = VocabularySearchIndex([
+        _word("v1", "firmware update"),
+        _word("v2", "update package"),
+        _word("v3", "Update"),
+        _word("v4", "delta", "增量更新"),
+    ])
+    assert _ids(index.search("update")) == ["v3", "v2", "v1"]
+    assert _ids(index.search("更新")) == ["v4"]
+
+
+def test_alias_matches_exactly():
+    index = VocabularySearchIndex([_word("v1", "rollback"), _word("v2", "roll back", aliases="roll-back")])
+    assert _ids(index.search("roll-back")) == ["v2"]
+
+
+def test_limit_takes_best_matches_first():
+    words = [_word(f"v{i}", f"x{i}a") for i in range(50)] + [_word("va", "a"), _word("vb", "abc")]
+    index = VocabularySearchIndex(words)
+    assert _ids(index.search("a", limit=3)) == ["va", "vb", "v0"]
+    assert index.search("a", limit=3) == index.search("a")[:3]
+
+
+def test_remove_hides_entries_without_rebuild():
+    index = VocabularySearchIndex([_word("v1", "apply"), _word("v2", "apple"), _word("v3", "grape")])
+    index.remove(["v2", "missing"])
+    assert len(index) == 2
+    assert _ids(index.search("ap")) == ["v1", "v3"]
+    assert _ids(index.search("ap", limit=1)) == ["v1"]
+    # 删除后再加入同一 id 可以重新找到
+    index.add([_word("v2", "apple")])
+    assert _ids(index.search("apple")) == ["v2"]
+
+
+def test_readding_an_id_replaces_the_old_entry():
+    index = VocabularySearchIndex([_word("v1", "flash")])
+    index.add([_word("v1", "reflash")])
+    assert len(index) == 1
+    assert _ids(index.search("flash")) == ["v1"]
+    assert index.search("flash")[0]["english"] == "reflash"
+
+
+def _item(item_id, category):
+    return {"id": item_id, "category": category}
+
+
+def test_category_buckets_keep_first_seen_order():
+    index = CategoryIndex([_item("v1", "OTA"), _item("v2", "CAN"), _item("v3", "OTA")])
+    assert index.names() == ["OTA", "CAN"]
+    assert [w["id"] for w in index.items("OTA")] == ["v1", "v3"]
+    assert index.count("OTA") == 2 and index.count("missing") == 0
+    assert index.contains("OTA", "v3") and not index.contains("CAN", "v3")
+
+
+def test_category_remove_drops_empty_buckets():
+    index = CategoryIndex([_item("v1", "OTA"), _item("v2", "CAN"), _item("v3", "OTA")])
+    index.remove(["v2", "v3", "missing"])
+    assert len(index) == 1
+    assert index.names() == ["OTA"]
+    assert index.name_of("v2") is None and index.get("v3") is None
+    assert [w["id"] for w in index.items("OTA")] == ["v1"]
+
+
+def test_category_readd_moves_item_to_new_bucket():
+    index = CategoryIndex([_item("v1", "OTA"), _item("v2", "OTA")])
+    index.add([_item("v1", "CAN")])
+    assert index.name_of("v1") == "CAN"
+    assert [w["id"] for w in index.items("OTA")] == ["v2"]
+    assert index.get("v1")["category"] == "CAN"
+
+
+def test_scenario_field():
+    index = CategoryIndex([{"id": "p1", "scenario": "刷写"}], field="scenario")
+    assert index.names() == ["刷写"]
+
+
+def _sampler(words):
+    return DistractorSampler(words, CategoryIndex(words))
+
+
+def _vocab(item_id, english, chinese, category="OTA"):
+    return {"id": item_id, "english": english, "chinese": chinese, "category": category}
+
+
+def test_distractors_have_unique_chinese_and_exclude_the_answer():
+    # 中文大量重复，拒绝采样必须退化为线性筛选才能凑满
+    words = [_vocab(f"v{i}", f"word{i}", "刷写" if i % 3 else "回滚") for i in range(30)]
+    words.append(_vocab("w1", "verify", "校验"))
+    words.append(_vocab("w2", "gateway", "网关"))
+    answer = words[0]
+    sampler = _sampler(words)
+    for hard in (False, True):
+        for seed in range(20):
+            picks = sampler.sample(answer, k=3, hard=hard, rng=random.Random(seed))
+            chinese = [w["chinese"] for w in picks]
+            assert len(picks) == 3
+            assert answer["chinese"] not in chinese
+            assert len(set(chinese)) == len(chinese)
+
+
+def test_distractors_stop_when_pool_runs_out():
+    words = [_vocab("v1", "flash", "刷写"), _vocab("v2", "reflash", "刷写"), _vocab("v3", "verify", "校验")]
+    picks = _sampler(words).sample(words[0], k=3, rng=random.Random(0))
+    assert [w["id"] for w in picks] == ["v3"]
+
+
+def test_category_pool_and_hard_neighbours():
+    words = [
+        _vocab("v1", "firmware", "固件"),
+        _vocab("v2", "firmware image", "固件镜像"),
+        _vocab("v3", "rollback", "回滚", "诊断"),
+        _vocab("v4", "gateway", "网关", "诊断"),
+    ]
+    sampler = _sampler(words)
+    assert sampler.neighbours(words[0])[0]["id"] == "v2"
+    picks = sampler.sample(words[2], k=3, category="诊断", rng=random.Random(0))
+    assert [w["id"] for w in picks] == ["v4"]
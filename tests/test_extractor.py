@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""extractor 分块提取测试"""
+
+from extractor import (
+    SentenceScanner, TermScanner, extract_chunks, extract_sentences_from_text, extract_words_from_text, scan_terms,
+)
+
+
+def _stats(terms):
+    return {k: (v.surface, v.count, v.first_offset) for k, v in terms.items()}
+
+
+def _feed(scanner, text, size):
+    for i in range(0, len(text), size):
+        scanner.feed(text[i:i + size])
+    return scanner
+
+
+def test_long_chunk_without_whitespace_is_split_not_carried():
+    blob = "/".join(f"token{i}x" for i in range(400))
+    text = f"Flash the ECU {blob} then reboot the gateway"
+    scanner = _feed(TermScanner(block_chars=64, fold_chunks=8), text, 7)
+    # 遗留部分不会随片段长度增长
+    assert len(scanner._carry) < 64 + 7
+    terms = scanner.terms()
+    assert _stats(terms) == _stats(scan_terms(text))
+    assert scanner.tokens == len(text.split())
+
+
+def test_word_run_longer_than_block_is_dropped():
+    text = "gateway " + "a" * 500 + " rollback firmware"
+    scanner = _feed(TermScanner(block_chars=64), text, 10)
+    terms = scanner.terms()
+    assert set(terms) == {"gateway", "rollback", "firmware"}
+    assert terms["rollback"].first_offset == 2
+    assert scanner.tokens == 4
+
+
+def test_sentence_limit_reports_truncation():
+    text = " ".join(f"Sentence number {i} describes the update flow." for i in range(5))
+    scanner = SentenceScanner(limit=3)
+    scanner.feed(text)
+    assert len(scanner.finish()) == 3
+    assert scanner.truncated
+
+    exact = SentenceScanner(limit=5)
+    exact.feed(text)
+    assert len(exact.finish()) == 5
+    assert not exact.truncated
+
+
+DOCUMENT = (
+    "OTA Update Procedure\n"
+    "The gateway downloads the firmware package over the air. The ECU verifies the signature "
+    "before flashing! Does the bootloader roll back when verification fails? Rollbacks are "
+    "logged by the gateway-controller.\n"
+    "ECUs report their firmware versions; the backend compares them with the campaign manifest.\n"
+) * 3 + "签名校验失败时回滚。 The update campaign ends when every vehicle reports success"
+
+
+def test_chunked_extraction_matches_whole_text():
+    whole = extract_chunks([DOCUMENT])
+    for size in (1, 7, 64, 1000):
+        chunks = [DOCUMENT[i:i + size] for i in range(0, len(DOCUMENT), size)]
+        assert extract_chunks(chunks) == whole
+    assert whole["sentences"] == extract_sentences_from_text(DOCUMENT)
+    assert whole["words"] == extract_words_from_text(DOCUMENT)
+    assert whole["tokens"] == len(DOCUMENT.split())
+    assert not whole["sentences_truncated"]
+
+
+def test_small_blocks_and_folds_match_whole_text():
+    expected = _stats(scan_terms(DOCUMENT))
+    for block_chars, fold_chunks in ((32, 1), (64, 4), (1 << 20, 1 << 16)):
+        scanner = _feed(TermScanner(block_chars=block_chars, fold_chunks=fold_chunks), DOCUMENT, 13)
+        terms = scanner.terms()
+        assert _stats(terms) == expected
+        assert list(terms) == list(expected)
+
+
+def test_sentence_scanner_matches_whole_text_for_any_split():
+    expected = extract_sentences_from_text(DOCUMENT)
+    for size in (1, 5, 33):
+        scanner = _feed(SentenceScanner(), DOCUMENT, size)
+        assert scanner.finish() == expected
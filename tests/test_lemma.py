@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""lemma 词形归一测试"""
+
+import pytest
+
+from lemma import canonical_key, merge_aliases
+
+
+@pytest.mark.parametrize("forms", [
+    ("flash", "flashes", "flashed", "flashing"),
+    ("roll-back", "roll_back", "rollback", "Roll Back"),
+    ("bus", "buses"),
+    ("box", "boxes"),
+    ("patch", "patches"),
+    ("class", "classes"),
+    ("status", "statuses"),
+    ("tie", "ties", "tied"),
+    ("die", "dies", "died"),
+    ("cry", "cries"),
+    ("use", "used", "uses", "using"),
+    ("update", "updates", "updated"),
+    ("ECU", "ECUs"),
+])
+def test_variants_share_a_key(forms):
+    assert len({canonical_key(form) for form in forms}) == 1
+
+
+@pytest.mark.parametrize("first, second", [
+    ("US", "us"),
+    ("US", "use"),
+    ("US", "used"),
+    ("us", "use"),
+    ("CAN", "can"),
+    ("SMS", "sm"),
+    ("gas", "ga"),
+    ("hop", "hope"),
+])
+def test_unrelated_words_keep_separate_keys(first, second):
+    assert canonical_key(first) != canonical_key(second)
+
+
+def test_merge_aliases_skips_case_duplicates():
+    assert merge_aliases("flash", "flashes", ["Flash", "flashed", "FLASHES"]) == "flashes, flashed"
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""list_html 紧凑列表渲染测试"""
+
+from extractor import extract_sentences_from_text
+from list_html import phrase_list_html, vocabulary_list_html
+
+
+def test_multiline_sentence_stays_in_one_html_block():
+    sentences = extract_sentences_from_text(
+        "The ECU receives the update package over the air. Next step\n\nverifies the signature before flashing."
+    )
+    assert any("\n" in s for s in sentences)
+    phrases = [{"english": s, "chinese": "第一行\n\n第二行", "scenario": "文档\n内容"} for s in sentences]
+    block = phrase_list_html(phrases)
+    assert "\n" not in block
+    assert "Next step verifies the signature" in block
+
+
+def test_vocabulary_fields_are_single_line_and_escaped():
+    word = {
+        "id": "custom_v1", "english": "roll\nback", "chinese": "回滚", "phonetic": "",
+        "example": "Roll back <now>.\n\nThen retry.", "category": "OTA", "aliases": "rollback,\nroll-back",
+    }
+    block = vocabulary_list_html([word], {"custom_v1": 40})
+    assert "\n" not in block
+    assert "Roll back &lt;now&gt;. Then retry." in block
+    assert "width: 40%" in block
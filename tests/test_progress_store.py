@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""progress_store 进度存储测试"""
+
+import time
+
+from progress_store import ProgressStore, ProgressWriter, ensure_stats
+
+
+def test_corrupt_snapshot_is_set_aside(tmp_path):
+    snapshot = tmp_path / "progress.json"
+    snapshot.write_text('{"mastery": {"w1": 4', encoding="utf-8")
+    store = ProgressStore(snapshot)
+
+    progress = store.load()
+    assert progress["mastery"] == {}
+    # 重建汇总计数会在文件锁内重新读取快照，不能因为损坏的文件失败
+    store.compact(migrate=lambda p: ensure_stats(p, lambda item_id: None))
+
+    assert len(list(tmp_path.glob("progress.json.corrupt.*"))) == 1
+    store.record("w2", 10, "test")
+    assert ProgressStore(snapshot).load()["mastery"] == {"w2": 10}
+
+
+def test_flush_on_empty_queue_keeps_debounce(tmp_path):
+    store = ProgressStore(tmp_path / "progress.json")
+    writer = ProgressWriter(interval=0.5)
+    try:
+        writer.flush()
+        writer.submit_record(store, "w1", 10, "test")
+        time.sleep(0.2)
+        assert not store.journal_path.exists()  # 仍在合并窗口内
+        writer.flush()
+        assert ProgressStore(tmp_path / "progress.json").load()["mastery"] == {"w1": 10}
+    finally:
+        writer.close()
+
+
+def test_reading_does_not_create_the_user_directory(tmp_path):
+    user_dir = tmp_path / "users" / "visitor"
+    store = ProgressStore(user_dir / "progress.json")
+    progress = store.load()
+    assert not ensure_stats(progress, lambda item_id: None)  # 空进度无需重建，不触发压缩
+    assert store.follow(progress) == []
+    assert not user_dir.exists()
+
+    store.record("w1", 10, "test")
+    assert user_dir.exists()
+    assert store.follow(progress) == []  # 本实例写入的记录不重复合并
+    assert ProgressStore(user_dir / "progress.json").load()["mastery"] == {"w1": 10}
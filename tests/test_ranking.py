@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""ranking 领域相关度排序测试"""
+
+import math
+
+from lemma import canonical_key
+from ranking import keyness, log_likelihood, merge_term_stats, rank_terms
+
+# 背景词表：每百万词出现次数
+BACKGROUND = {"page": 500.0, "copyright": 100.0, "firmware": 1.0, "gateway": 2.0, "rollback": 1.0}
+
+
+def _result(words, counts, tokens, lines=None, cooc=None):
+    return {"words": words, "counts": counts, "tokens": tokens,
+            "lines": lines or [0] * len(words), "cooc": cooc or [0] * len(words)}
+
+
+def test_log_likelihood_sign_follows_relative_frequency():
+    assert log_likelihood(10, 1000, 10, 100_000) > 0
+    assert log_likelihood(1, 1000, 1000, 100_000) < 0
+    assert math.isclose(log_likelihood(1, 100, 1000, 100_000), 0.0, abs_tol=1e-9)
+    # 同样高于背景时出现越多得分越高
+    assert log_likelihood(20, 1000, 10, 100_000) > log_likelihood(10, 1000, 10, 100_000)
+
+
+def test_cooccurrence_boosts_only_positive_scores():
+    base = keyness(5, 1000, 1.0)
+    assert keyness(5, 1000, 1.0, lines=4, cooc=4) == base * 2
+    assert keyness(5, 1000, 1.0, lines=4, cooc=2) == base * 1.5
+    low = keyness(1, 1000, 50_000.0)
+    assert low < 0
+    assert keyness(1, 1000, 50_000.0, lines=1, cooc=1) == low
+
+
+def test_domain_terms_rank_above_boilerplate():
+    result = _result(["Page", "Copyright", "firmware", "gateway"], [5, 5, 5, 5], 1000)
+    assert rank_terms([result], background=BACKGROUND) == ["firmware", "gateway", "Copyright", "Page"]
+
+
+def test_ties_keep_document_order_and_limit_takes_the_top():
+    result = _result(["rollback", "firmware", "gateway", "page"], [3, 3, 3, 3], 1000)
+    ranked = rank_terms([result], background=BACKGROUND)
+    assert ranked[:2] == ["rollback", "firmware"]
+    assert rank_terms([result], limit=2, background=BACKGROUND) == ranked[:2]
+    assert rank_terms([result], limit=10, background=BACKGROUND) == ranked
+
+
+def test_excluded_keys_do_not_take_slots():
+    result = _result(["firmware", "gateway", "rollback"], [9, 5, 3], 1000)
+    ranked = rank_terms([result], limit=1, exclude={canonical_key("firmware")}, background=BACKGROUND)
+    assert ranked == ["gateway"]
+
+
+def test_stats_merge_across_files_by_canonical_key():
+    first = _result(["gateway"], [2], 100, lines=[2], cooc=[1])
+    second = _result(["gateways", "firmware"], [3, 1], 50, lines=[3, 1], cooc=[3, 0])
+    stats, tokens = merge_term_stats([first, second])
+    assert tokens == 150
+    assert stats[canonical_key("gateway")] == ["gateway", 5, 5, 4]
+    assert list(stats) == [canonical_key("gateway"), canonical_key("firmware")]
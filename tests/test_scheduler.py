@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""scheduler 间隔重复调度测试"""
+
+from scheduler import (
+    DAY_SECONDS, GRADE_AGAIN, GRADE_EASY, GRADE_GOOD, GRADE_HARD, INITIAL_EASE, MIN_EASE, RELEARN_SECONDS,
+    DueQueue, review,
+)
+
+NOW = 1_700_000_000
+
+
+def test_intervals_follow_sm2():
+    card = review(None, GRADE_GOOD, NOW)
+    assert (card["n"], card["i"], card["e"]) == (1, 1, INITIAL_EASE)
+    assert card["due"] == NOW + DAY_SECONDS
+    card = review(card, GRADE_GOOD, NOW)
+    assert (card["n"], card["i"]) == (2, 6)
+    card = review(card, GRADE_GOOD, NOW)
+    assert (card["n"], card["i"]) == (3, 15)
+    assert card["due"] == NOW + 15 * DAY_SECONDS
+
+
+def test_grade_changes_ease():
+    assert review(None, GRADE_EASY, NOW)["e"] == 2.6
+    assert review(None, GRADE_HARD, NOW)["e"] == 2.36
+
+
+def test_lapse_resets_and_relearns_soon():
+    card = review(review(review(None, GRADE_GOOD, NOW), GRADE_GOOD, NOW), GRADE_AGAIN, NOW)
+    assert (card["n"], card["i"]) == (0, 0)
+    assert card["due"] == NOW + RELEARN_SECONDS
+    assert review(card, GRADE_GOOD, NOW)["i"] == 1
+
+
+def test_ease_has_a_floor():
+    card = None
+    for _ in range(10):
+        card = review(card, GRADE_AGAIN, NOW)
+    assert card["e"] == MIN_EASE
+
+
+def test_review_does_not_modify_card():
+    card = review(None, GRADE_GOOD, NOW)
+    before = dict(card)
+    review(card, GRADE_AGAIN, NOW)
+    assert card == before
+
+
+def test_peek_returns_earliest_due_without_popping():
+    queue = DueQueue({"a": {"due": 30}, "b": {"due": 10}, "c": {"due": 20}})
+    assert queue.peek(2) == ["b", "c"]
+    assert queue.peek(3) == ["b", "c", "a"]
+    assert queue.peek(3, now=20) == ["b", "c"]
+
+
+def test_updates_and_discards_invalidate_old_entries():
+    queue = DueQueue({"a": {"due": 10}, "b": {"due": 20}})
+    queue.update("a", 30)
+    queue.discard("b")
+    queue.update("c", 5)
+    assert len(queue) == 2 and "b" not in queue
+    assert queue.peek(5) == ["c", "a"]
+
+
+def test_peek_skips_excluded_and_missing_items():
+    queue = DueQueue({"a": {"due": 1}, "b": {"due": 2}, "c": {"due": 3}})
+    assert queue.peek(2, exclude={"a"}, exists=lambda item_id: item_id != "b") == ["c"]
+    assert queue.peek(1) == ["a"]
+
+
+def test_heap_is_compacted_after_many_updates():
+    queue = DueQueue({"a": {"due": 0}})
+    for due in range(1, 1000):
+        queue.update("a", due)
+    assert len(queue._heap) <= 2 * len(queue) + 64
+    assert queue.peek(5) == ["a"]
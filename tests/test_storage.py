@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""storage.CustomStore 测试"""
+
+import json
+
+from storage import CustomStore
+
+
+def test_ids_not_reused_after_migrate_and_clear(tmp_path):
+    legacy = tmp_path / "custom_vocabulary.json"
+    legacy.write_text(json.dumps({
+        "vocabulary": [{"id": f"custom_v{i}", "english": f"word{i}", "chinese": "词"} for i in (1, 2, 3)],
+        "phrases": [{"id": "custom_p1", "english": "Hello there.", "chinese": "你好"}],
+    }), encoding="utf-8")
+    store = CustomStore(tmp_path / "custom.db", legacy_json=legacy)
+    try:
+        store.clear()
+        item = {"english": "rollback", "chinese": "回滚"}
+        phrase = {"english": "Roll it back.", "chinese": "回滚"}
+        store.add_vocabulary([item])
+        store.add_phrases([phrase])
+        assert item["id"] == "custom_v4"
+        assert phrase["id"] == "custom_p2"
+    finally:
+        store.close()
+
+
+def test_ids_not_reused_after_clear_without_allocation(tmp_path):
+    store = CustomStore(tmp_path / "custom.db")
+    try:
+        store.add_vocabulary([{"id": "custom_v7", "english": "flash", "chinese": "刷写"}])
+        store.clear()
+        assert store.allocate_ids("vocabulary", 1) == ["custom_v8"]
+    finally:
+        store.close()
+
+
+def test_corrupt_legacy_json_is_set_aside(tmp_path):
+    legacy = tmp_path / "custom_vocabulary.json"
+    legacy.write_text('{"vocabulary": [{"id": "custom_v1", "english": "fla', encoding="utf-8")
+    store = CustomStore(tmp_path / "custom.db", legacy_json=legacy)
+    try:
+        assert store.migration_warning
+        assert store.count("vocabulary") == 0
+        store.add_vocabulary([{"english": "flash", "chinese": "刷写"}])
+    finally:
+        store.close()
+    assert not legacy.exists()
+    assert (tmp_path / "custom_vocabulary.json.corrupt").exists()
+
+    # 迁移已标记完成：再次打开不再报告
+    store = CustomStore(tmp_path / "custom.db", legacy_json=legacy)
+    try:
+        assert store.migration_warning is None
+        assert store.count("vocabulary") == 1
+    finally:
+        store.close()